@@ -1,13 +1,13 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import numpy as np
 import soundfile as sf
 import io
-import tempfile
 import os
 import sys
-from typing import Optional
+from typing import List, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -46,25 +46,29 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+async def _read_upload(request, file):
+    """
+    Audio bytes from either a multipart 'file' field or a raw request body
+    (Content-Type: audio/wav), which skips the multipart framing.
+    """
+    if file is not None:
+        return await file.read()
+    contents = await request.body()
+    if not contents:
+        raise HTTPException(status_code=400, detail="No audio provided. Send a 'file' form field or a raw audio/wav body.")
+    return contents
+
 @app.post("/api/set-baseline")
-async def set_baseline(file: UploadFile = File(...)):
+async def set_baseline(request: Request, file: Optional[UploadFile] = File(None)):
     """Set the baseline voice signature"""
     global baseline_features
     
     try:
         # Read uploaded file
-        contents = await file.read()
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp:
-            tmp.write(contents)
-            tmp_path = tmp.name
-        
-        # Extract features
-        success = detector.set_baseline(tmp_path)
+        contents = await _read_upload(request, file)
         
-        # Cleanup
-        os.unlink(tmp_path)
+        # Extract features straight from the upload bytes
+        success = detector.set_baseline(io.BytesIO(contents))
         
         if success:
             baseline_features = detector.baseline_features
@@ -79,12 +83,55 @@ async def set_baseline(file: UploadFile = File(...)):
                 detail="Failed to extract features. Audio might be corrupted or too silent."
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _decode_contents(contents):
+    """Decode uploaded wav bytes to a mono signal."""
+    # Load audio straight from the upload bytes
+    y, sr = sf.read(io.BytesIO(contents), dtype='float32')
+    if len(y.shape) > 1:
+        y = y.mean(axis=1, dtype=np.float32)  # Convert to mono
+    return y, sr
+
+def _build_response(result, strictness):
+    """Turn an analyze_chunk result into the response payload."""
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    # Get robust analysis
+    features = result["features"]
+    robust_res = robust_detector.analyze(features, strictness=strictness)
+    
+    return {
+        "success": True,
+        "is_match": robust_res["is_match"],
+        "is_ai_generated": robust_res["is_ai_generated"],
+        "confidence": float(robust_res["confidence"]),
+        "deviation": float(robust_res["deviation"]),
+        "threshold": robust_res["threshold"],
+        "threshold_level": robust_res["threshold_level"],
+        "risk_level": robust_res["risk_level"],
+        "verdict": robust_res["verdict"],
+        "mfcc_similarity": float(robust_res["mfcc_similarity"]),
+        "phase_similarity": float(robust_res["phase_similarity"]),
+        "spectral_similarity": float(robust_res["spectral_similarity"])
+    }
+
+def _analyze_contents(contents, strictness):
+    """Run the detector pair on one uploaded wav and build the response payload."""
+    y, sr = _decode_contents(contents)
+    
+    # Analyze
+    result = detector.analyze_chunk(y, sr)
+    return _build_response(result, strictness)
+
 @app.post("/api/analyze")
 async def analyze_voice(
-    file: UploadFile = File(...),
+    request: Request,
+    file: Optional[UploadFile] = File(None),
     strictness: str = "normal"
 ):
     """Analyze a voice sample against the baseline"""
@@ -98,51 +145,57 @@ async def analyze_voice(
     
     try:
         # Read uploaded file
-        contents = await file.read()
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp:
-            tmp.write(contents)
-            tmp_path = tmp.name
-        
-        # Load audio
-        y, sr = sf.read(tmp_path)
-        if len(y.shape) > 1:
-            y = y.mean(axis=1)  # Convert to mono
-        
-        # Analyze
-        result = detector.analyze_chunk(y, sr)
-        
-        # Cleanup
-        os.unlink(tmp_path)
-        
-        if "error" in result:
-            raise HTTPException(status_code=400, detail=result["error"])
-        
-        # Get robust analysis
-        features = result["features"]
-        robust_res = robust_detector.analyze(features, strictness=strictness)
-        
-        return {
-            "success": True,
-            "is_match": robust_res["is_match"],
-            "is_ai_generated": robust_res["is_ai_generated"],
-            "confidence": float(robust_res["confidence"]),
-            "deviation": float(robust_res["deviation"]),
-            "threshold": robust_res["threshold"],
-            "threshold_level": robust_res["threshold_level"],
-            "risk_level": robust_res["risk_level"],
-            "verdict": robust_res["verdict"],
-            "mfcc_similarity": float(robust_res["mfcc_similarity"]),
-            "phase_similarity": float(robust_res["phase_similarity"]),
-            "spectral_similarity": float(robust_res["spectral_similarity"])
-        }
+        contents = await _read_upload(request, file)
+        # CPU-bound: run off the event loop so concurrent requests can overlap
+        return await run_in_threadpool(_analyze_contents, contents, strictness)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze-batch")
+async def analyze_voice_batch(
+    files: List[UploadFile] = File(...),
+    strictness: str = "normal"
+):
+    """
+    Analyze several voice samples against the baseline in one request.
+    Results are returned in upload order; a file that fails carries its own
+    error instead of failing the whole batch.
+    """
+    global baseline_features
+    
+    if baseline_features is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Baseline not set. Please set a baseline signature first."
+        )
+    
+    # Decode everything first; files that fail to decode keep their slot
+    results = [None] * len(files)
+    decoded = []
+    for i, file in enumerate(files):
+        try:
+            decoded.append((i, _decode_contents(await file.read())))
+        except Exception as e:
+            results[i] = {"success": False, "error": str(e)}
+    
+    # Each file goes through the same per-clip extract_chunk_features path as
+    # /api/analyze, so a file gets the same verdict from either endpoint
+    chunk_results = await run_in_threadpool(
+        lambda: [detector.analyze_chunk(y, sr) for _, (y, sr) in decoded]
+    )
+    for (i, _), result in zip(decoded, chunk_results):
+        try:
+            results[i] = _build_response(result, strictness)
+        except HTTPException as e:
+            results[i] = {"success": False, "error": e.detail}
+        except Exception as e:
+            results[i] = {"success": False, "error": str(e)}
+    
+    return {"success": True, "results": results}
+
 @app.post("/api/reset")
 def reset_baseline():
     """Reset the baseline signature"""
@@ -1,14 +1,47 @@
 import os
+import atexit
+from functools import lru_cache
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@lru_cache(maxsize=4)
+def _get_featherless_client(base_url, api_key):
+    """
+    Returns a process-wide OpenAI client for Featherless so every challenge
+    reuses the same pooled keep-alive connections instead of paying a fresh
+    TCP + TLS handshake per call.
+    """
+    import httpx
+    from openai import OpenAI
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_keepalive_connections=16)
+    )
+    atexit.register(http_client.close)
+    return OpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+
 class APIIntegrations:
     def __init__(self):
         self.elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
         self.featherless_api_key = os.getenv("FEATHERLESS_API_KEY")
         self.featherless_base_url = os.getenv("FEATHERLESS_BASE_URL", "https://api.featherless.ai/v1")
+
+        # Pooled keep-alive session for ElevenLabs. TTS calls are billed POSTs, so only
+        # retry when the request cannot have been processed: failed connects, and
+        # 429 rate limits (honouring Retry-After). Read errors and 5xx are not retried
+        self.session = requests.Session()
+        retries = Retry(
+            total=3, connect=3, read=0, status=3, backoff_factor=0.3,
+            status_forcelist=(429,), allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+            respect_retry_after_header=True
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+        if self.elevenlabs_api_key:
+            self.session.headers.update({"xi-api-key": self.elevenlabs_api_key})
         
     def generate_attack_sample(self, text="Hello, my voice is my password. Authenticate me immediately.", output_path="synthetic_attack.wav"):
         """
@@ -24,8 +57,7 @@ class APIIntegrations:
         url = "https://api.elevenlabs.io/v1/text-to-speech/21m00Tcm4TlvDq8ikWAM" # Generic voice for demo
         headers = {
             "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.elevenlabs_api_key
+            "Content-Type": "application/json"
         }
         
         data = {
@@ -39,7 +71,7 @@ class APIIntegrations:
         
         try:
             print(f"Generating ElevenLabs attack sample...")
-            response = requests.post(url, json=data, headers=headers)
+            response = self.session.post(url, json=data, headers=headers, timeout=60)
             if response.status_code == 200:
                 # Save as MP3 temporarily, then pydub will handle it in the extractor
                 with open(output_path, "wb") as f:
@@ -60,13 +92,9 @@ class APIIntegrations:
         """
         if not self.featherless_api_key:
             return "Please repeat the following phrase: 'The quick brown fox jumps over the lazy dog.'"
-            
+
         try:
-            from openai import OpenAI
-            client = OpenAI(
-                base_url=self.featherless_base_url,
-                api_key=self.featherless_api_key
-            )
+            client = _get_featherless_client(self.featherless_base_url, self.featherless_api_key)
             
             response = client.chat.completions.create(
                 model="meta-llama/Meta-Llama-3-8B-Instruct", # Example model, or whichever featherless is serving
@@ -77,6 +105,7 @@ class APIIntegrations:
                 max_tokens=30,
                 temperature=0.9
             )
+            # Never reused: a liveness phrase is only worth anything if it is unpredictable
             return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"Featherless AI error: {e}")
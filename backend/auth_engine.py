@@ -7,6 +7,10 @@ class KuralPulseAuthEngine:
     def __init__(self, baseline_path="vocal_twin.json"):
         self.baseline_path = Path(baseline_path)
         self.baseline_profile = None
+        # Baseline embedding as an array plus its norm, rebuilt only when the profile changes
+        self._baseline_cache_for = None
+        self._baseline_embedding = None
+        self._baseline_norm = 0.0
         
         # Load the baseline profile into cache if it exists
         if self.baseline_path.exists():
@@ -31,6 +35,27 @@ class KuralPulseAuthEngine:
             return 0.0
         return dot_product / (norm_a * norm_b)
 
+    def _baseline_vector(self):
+        """Enrolled identity embedding and its norm, computed once per enrolled profile."""
+        if self._baseline_cache_for is not self.baseline_profile:
+            self._baseline_embedding = np.asarray(self.baseline_profile.get("identity_embedding", []), dtype=np.float64)
+            self._baseline_norm = float(np.linalg.norm(self._baseline_embedding))
+            self._baseline_cache_for = self.baseline_profile
+        return self._baseline_embedding, self._baseline_norm
+
+    def identity_similarity(self, test_embedding):
+        """cosine_similarity() against the enrolled embedding, reusing its cached norm."""
+        base, norm_base = self._baseline_vector()
+        test = np.asarray(test_embedding, dtype=np.float64)
+        
+        if len(base) == 0 or len(test) == 0:
+            return 0.0
+            
+        norm_test = np.linalg.norm(test)
+        if norm_base == 0 or norm_test == 0:
+            return 0.0
+        return np.dot(base, test) / (norm_base * norm_test)
+
     def set_vocal_twin(self, profile):
         """Securely stores the base signature profile."""
         if not profile or not profile.get("identity_embedding"):
@@ -87,10 +112,7 @@ class KuralPulseAuthEngine:
             return {"error": "No Vocal Twin Signature enrolled."}
             
         # 1. Identity Check (Speaker Verification)
-        id_similarity = self.cosine_similarity(
-            self.baseline_profile.get("identity_embedding", []),
-            test_profile.get("identity_embedding", [])
-        )
+        id_similarity = self.identity_similarity(test_profile.get("identity_embedding", []))
         
         # The typical identical-speaker threshold for SpeechBrain ECAPA-TDNN is ~0.25 (raw cosine scoring).
         # We must statistically scale the raw similarity onto the visual percentage curve.
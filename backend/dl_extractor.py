@@ -7,51 +7,110 @@ import torchaudio
 if not hasattr(torchaudio, 'list_audio_backends'):
     torchaudio.list_audio_backends = lambda: ['soundfile']
 
-import shutil
-if os.name == 'nt':
-    def _safe_symlink(src, dst, target_is_directory=False, **kwargs):
-        try:
-            if target_is_directory:
-                shutil.copytree(str(src), str(dst), dirs_exist_ok=True)
-            else:
-                shutil.copy(str(src), str(dst))
-        except Exception as e:
-            print(f"Safe symlink copy failed: {e}")
-    os.symlink = _safe_symlink
-
-import huggingface_hub
-
-_orig_snapshot_download = huggingface_hub.snapshot_download
-def _patched_snapshot_download(*args, **kwargs):
-    kwargs.pop("use_auth_token", None)
-    return _orig_snapshot_download(*args, **kwargs)
-huggingface_hub.snapshot_download = _patched_snapshot_download
-
-_orig_hf_hub_download = huggingface_hub.hf_hub_download
-def _patched_hf_hub_download(*args, **kwargs):
-    kwargs.pop("use_auth_token", None)
-    return _orig_hf_hub_download(*args, **kwargs)
-huggingface_hub.hf_hub_download = _patched_hf_hub_download
-
-import speechbrain.utils.fetching
-speechbrain.utils.fetching.huggingface_hub.hf_hub_download = _patched_hf_hub_download
-
 import librosa
 import numpy as np
+import soundfile as sf
 from pathlib import Path
 from transformers import Wav2Vec2Processor, Wav2Vec2Model
-from speechbrain.inference.speaker import EncoderClassifier
+from speechbrain.lobes.features import Fbank
+from speechbrain.lobes.models.ECAPA_TDNN import ECAPA_TDNN
+from speechbrain.processing.features import InputNormalization
 
 # We will use dotenv to occasionally check env overrides or HF tokens if needed
 from dotenv import load_dotenv
 load_dotenv()
 
+def load_audio(audio_path, target_sr=16000):
+    """
+    Decode to mono float32 at target_sr. WAVs go through a single libsndfile call
+    and are only resampled when their rate differs; anything libsndfile can't
+    open falls back to librosa.load.
+    """
+    try:
+        y, sr = sf.read(audio_path, dtype='float32')
+    except RuntimeError:
+        return librosa.load(audio_path, sr=target_sr)
+    if y.ndim > 1:
+        y = y.mean(axis=1)
+    if sr != target_sr:
+        y = librosa.resample(y, orig_sr=sr, target_sr=target_sr, res_type='soxr_hq')
+    return y, target_sr
+
+ECAPA_DIR = "pretrained_models/spkrec-ecapa-voxceleb"
+
+class EcapaEncoder(torch.nn.Module):
+    """
+    The spkrec-ecapa-voxceleb embedding pipeline (Fbank -> sentence mean norm -> ECAPA-TDNN)
+    built directly from its hyperparameters, so loading is one torch.load of
+    embedding_model.ckpt instead of from_hparams' YAML parse and fetch step.
+    encode_batch matches EncoderClassifier.encode_batch (normalize=False).
+    """
+    def __init__(self, checkpoint=os.path.join(ECAPA_DIR, "embedding_model.ckpt"), device="cpu"):
+        super().__init__()
+        self.compute_features = Fbank(n_mels=80)
+        self.mean_var_norm = InputNormalization(norm_type="sentence", std_norm=False)
+        self.embedding_model = ECAPA_TDNN(
+            input_size=80,
+            channels=[1024, 1024, 1024, 1024, 3072],
+            kernel_sizes=[5, 3, 3, 3, 1],
+            dilations=[1, 2, 3, 4, 1],
+            attention_channels=128,
+            lin_neurons=192,
+        )
+        self.embedding_model.load_state_dict(torch.load(checkpoint, map_location="cpu"))
+        self.device = device
+        self.to(device)
+        self.eval()
+
+    @torch.no_grad()
+    def encode_batch(self, wavs, wav_lens=None):
+        """[batch, samples] float waveforms -> [batch, 1, 192] embeddings."""
+        wavs = wavs.to(self.device).float()
+        if wav_lens is None:
+            wav_lens = torch.ones(wavs.shape[0], device=self.device)
+        wav_lens = wav_lens.to(self.device)
+        feats = self.compute_features(wavs)
+        feats = self.mean_var_norm(feats, wav_lens)
+        return self.embedding_model(feats, wav_lens)
+
+def compile_model(model, *example_inputs):
+    """
+    torch.compile with dynamic shapes (clip lengths vary); falls back to eager on failure.
+    torch.compile is lazy, so a warm-up forward on example_inputs runs inside the
+    try: a backend/graph failure surfaces here instead of on the first real call.
+    """
+    try:
+        compiled = torch.compile(model, dynamic=True)
+        with torch.no_grad():
+            compiled(*example_inputs)
+        return compiled
+    except Exception as e:
+        print(f"torch.compile unavailable, running eager: {e}")
+        return model
+
+def quantize_linear_layers(model):
+    """int8 dynamic quantization of every nn.Linear (CPU inference only)."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
 class KuralPulseExtractor:
-    def __init__(self, device=None):
+    def __init__(self, device=None, quantize=None, compile_models=None):
         if device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
+
+        # Opt-in int8 weights for wav2vec2 on CPU deployments (KURAL_QUANTIZE=1). Off by default
+        # so embeddings, and therefore the tuned match thresholds, stay bit-identical.
+        if quantize is None:
+            quantize = os.environ.get("KURAL_QUANTIZE") == "1"
+        self.quantize = quantize and self.device == "cpu"
+
+        # Opt-in torch.compile of both forward passes (KURAL_COMPILE=1). The first
+        # call per input shape pays the compile cost, so this only suits long-lived
+        # processes such as the API server or a cached Streamlit resource.
+        if compile_models is None:
+            compile_models = os.environ.get("KURAL_COMPILE") == "1"
+        self.compile_models = compile_models
             
         print(f"Initializing Kural-Pulse Extractor on {self.device}...")
         
@@ -62,11 +121,16 @@ class KuralPulseExtractor:
         # 1. SpeechBrain Speaker Embedding Model (Identity Check)
         # Using ECAPA-TDNN trained on VoxCeleb loaded LOCALLY
         try:
-            self.speaker_model = EncoderClassifier.from_hparams(
-                source="pretrained_models/spkrec-ecapa-voxceleb",
-                savedir="pretrained_models/spkrec-ecapa-voxceleb",
-                run_opts={"device": self.device}
-            )
+            # KURAL_QUANTIZE does not touch ECAPA: ECAPA_TDNN is built only from
+            # Conv1d/BatchNorm layers (its fc is a Conv1d too), so dynamic Linear
+            # quantization would be a no-op
+            self.speaker_model = EcapaEncoder(device=self.device)
+            if self.compile_models:
+                # Warm-up input: [batch, frames, 80 Fbank bins] plus relative lengths
+                self.speaker_model.embedding_model = compile_model(
+                    self.speaker_model.embedding_model,
+                    torch.randn(1, 100, 80, device=self.device), torch.ones(1, device=self.device)
+                )
         except Exception as e:
             print(f"Failed to load SpeechBrain model: {e}")
             self.speaker_model = None
@@ -77,6 +141,11 @@ class KuralPulseExtractor:
             self.w2v_processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base")
             self.w2v_model = Wav2Vec2Model.from_pretrained("facebook/wav2vec2-base").to(self.device)
             self.w2v_model.eval()
+            if self.quantize:
+                self.w2v_model = quantize_linear_layers(self.w2v_model)
+            if self.compile_models:
+                # Warm-up input: one second of 16 kHz audio
+                self.w2v_model = compile_model(self.w2v_model, torch.zeros(1, 16000, device=self.device))
         except Exception as e:
             print(f"Failed to load Wav2Vec2 model: {e}")
             self.w2v_model = None
@@ -84,32 +153,48 @@ class KuralPulseExtractor:
     def preprocess_audio(self, audio_path, target_sr=16000, target_duration=None):
         """Load and normalize audio uniformly for DL models."""
         try:
-            y, sr = librosa.load(audio_path, sr=target_sr)
-            
-            # Simple VAD (Voice Activity Detection): Trim leading/trailing silence
-            y, _ = librosa.effects.trim(y, top_db=30)
-            
-            if target_duration:
-                target_length = int(target_duration * target_sr)
-                if len(y) > target_length:
-                    y = y[:target_length]
-                else:
-                    y = np.pad(y, (0, max(0, target_length - len(y))))
-            
-            return y, target_sr
+            y, sr = load_audio(audio_path, target_sr=target_sr)
+            return self.preprocess_array(y, sr, target_sr=target_sr, target_duration=target_duration)
         except Exception as e:
             print(f"Preprocess error for {audio_path}: {e}")
             return None, None
 
+    def preprocess_array(self, y, sr, target_sr=16000, target_duration=None):
+        """preprocess_audio for an already-decoded mono signal."""
+        if sr != target_sr:
+            y = librosa.resample(y, orig_sr=sr, target_sr=target_sr)
+
+        # Simple VAD (Voice Activity Detection): Trim leading/trailing silence
+        y, _ = librosa.effects.trim(y, top_db=30)
+
+        if target_duration:
+            target_length = int(target_duration * target_sr)
+            if len(y) > target_length:
+                y = y[:target_length]
+            else:
+                y = np.pad(y, (0, max(0, target_length - len(y))))
+
+        return y, target_sr
+
     def extract_identity_embedding(self, audio_path):
         """Extracts X-Vector biological identity using SpeechBrain."""
         if not self.speaker_model:
             return None
         
         try:
-            # Avoid torchaudio backend issues, load with librosa/soundfile and convert to tensor
-            y, sr = librosa.load(audio_path, sr=16000)
-            
+            # Avoid torchaudio backend issues, load with soundfile and convert to tensor
+            y, sr = load_audio(audio_path)
+        except Exception as e:
+            print(f"SpeechBrain load error for {audio_path}: {e}")
+            return None
+        return self.extract_identity_embedding_array(y)
+
+    def extract_identity_embedding_array(self, y):
+        """extract_identity_embedding for a 16 kHz mono signal already in memory."""
+        if not self.speaker_model:
+            return None
+
+        try:
             # Convert to torch tensor
             signal = torch.tensor(y, dtype=torch.float32).unsqueeze(0).to(self.device)
             # signal shape: [batch, samples]
@@ -152,8 +237,8 @@ class KuralPulseExtractor:
         # 2. Phase Discontinuity Analysis (Digital STFT Stitches)
         # Deepfakes & Vocoders often struggle with phase alignment across frames.
         try:
-            stft = librosa.stft(y, n_fft=2048, hop_length=512)
-            phase = np.angle(stft)
+            stft = librosa.stft(y.astype(np.float32, copy=False), n_fft=2048, hop_length=512)
+            phase = np.angle(stft).astype(np.float32, copy=False)
             # Calculate absolute phase difference between consecutive frames
             phase_diff = np.abs(np.diff(phase, axis=1))
             # Normalize phase diff to wrap around Pi
@@ -167,7 +252,7 @@ class KuralPulseExtractor:
 
         # 3. Traditional Acoustic MFCC (Baseline Resonance)
         try:
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=40)
+            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=40).astype(np.float32, copy=False)
             features["mfcc_mean"] = mfccs.mean(axis=1).tolist()
         except Exception:
             features["mfcc_mean"] = []
@@ -176,15 +261,28 @@ class KuralPulseExtractor:
 
     def get_full_profile(self, audio_path):
         """Runs the entire biological + anti-spoof extraction pipeline."""
-        y, sr = self.preprocess_audio(audio_path, target_sr=16000)
-        if y is None:
+        try:
+            y, sr = load_audio(audio_path)
+        except Exception as e:
+            print(f"Preprocess error for {audio_path}: {e}")
             return None
+        return self.get_full_profile_array(y, sr)
+
+    def get_full_profile_array(self, y, sr):
+        """
+        get_full_profile for a decoded mono signal, so callers holding the samples
+        (e.g. an in-memory upload) skip the temp-file write and the re-decode.
+        """
+        if sr != 16000:
+            y = librosa.resample(y, orig_sr=sr, target_sr=16000)
+            sr = 16000
+
+        # Deep Identity Embedding (on the untrimmed signal, as before)
+        identity = self.extract_identity_embedding_array(y)
 
-        # Deep Identity Embedding
-        identity = self.extract_identity_embedding(audio_path)
-        
         # Biological Acoustic & Synthetic Ghost Analysis
-        artifact_metrics = self.extract_synthetic_artifacts(y, sr)
+        y_trimmed, sr = self.preprocess_array(y, sr, target_sr=16000)
+        artifact_metrics = self.extract_synthetic_artifacts(y_trimmed, sr)
         
         return {
             "identity_embedding": identity.tolist() if identity is not None else [],
@@ -1,83 +1,45 @@
 import os
 from typing import Dict, Any
 import json
+import hashlib
+from functools import lru_cache
 import numpy as np
 import librosa
 from pathlib import Path
 from joblib import Parallel, delayed
 from tqdm import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional: features.json falls back to json + _json_default
+
 from backend.audio_normalizer import normalize_audio
 from backend.utils import calculate_jitter, calculate_phase_discontinuity
 
+# On-disk feature cache, keyed on path + mtime + size so an edited wav is re-extracted.
+# Set FEATURE_CACHE_REGENERATE=1 to ignore (and overwrite) existing entries.
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", ".feature_cache")
+# Part of every cache key: bump whenever extraction changes what it returns
+# (pyin settings, MFCC pipeline, new fields) so stale entries are not served
+FEATURE_VERSION = 3
+
 def extract_features(audio_path, sr=16000, n_mfcc=40):
     """
     Extract MFCC, Spectral, and Phase continuity features for a single file.
+    audio_path may also be a binary file-like object (e.g. io.BytesIO of an upload).
     Returns a dictionary of features.
     """
     try:
-        if not os.path.exists(audio_path):
+        is_path = isinstance(audio_path, (str, os.PathLike))
+        if is_path and not os.path.exists(audio_path):
             print(f"File not found: {audio_path}")
             return None
             
         import soundfile as sf
-        y, orig_sr = sf.read(audio_path)
-        
-        # If stereo, librosa to_mono expects shape (2, n), soundfile gives (n, 2)
-        if len(y.shape) > 1:
-            y = y.mean(axis=1)
-            
-        # Normalize to exactly 3.5 seconds
-        y, _ = normalize_audio(y, orig_sr, target_duration=3.5)
-        
-        features: Dict[str, Any] = {}
-        
-        # 1. Extract MFCCs
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc)
-        mfccs_delta = librosa.feature.delta(mfccs)
-        
-        features["mfcc_mean"] = mfccs.mean(axis=1).tolist()
-        features["mfcc_std"] = mfccs.std(axis=1).tolist()
-        features["mfcc_delta_mean"] = mfccs_delta.mean(axis=1).tolist()
-        
-        # 2. Extract Spectral Features
-        spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
-        spectral_contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
-        
-        features["spectral_centroid_mean"] = float(spectral_centroid.mean())
-        features["spectral_centroid_std"] = float(spectral_centroid.std())
-        features["spectral_bandwidth_mean"] = float(spectral_bandwidth.mean())
-        features["spectral_bandwidth_std"] = float(spectral_bandwidth.std())
-        features["spectral_contrast_mean"] = spectral_contrast.mean(axis=1).tolist()
-        features["spectral_contrast_std"] = spectral_contrast.std(axis=1).tolist()
-        
-        # 3. Phase Analysis (CRUCIAL for AI Detection)
-        phase_metrics = calculate_phase_discontinuity(y)
-        for k, v in phase_metrics.items():
-            features[f"phase_{k}"] = v
-            
-        # 4. Zero Crossing Rate (AI Detection)
-        zcr = librosa.feature.zero_crossing_rate(y)[0]
-        features["zero_crossing_rate_mean"] = float(zcr.mean())
-        features["zero_crossing_rate_std"] = float(zcr.std())
-            
-        # 5. Jitter
-        features["jitter"] = calculate_jitter(y, sr)
-        
-        # File info
-        features["filename"] = Path(audio_path).name
-        
-        # Add labels if available (e.g. dataset directory names)
-        path_str = str(audio_path).lower()
-        if 'real' in path_str:
-            features['label'] = 'real'
-        elif 'fake' in path_str or 'ai' in path_str:
-            features['label'] = 'fake'
-        else:
-            features['label'] = None
-            
-        return features
+        y, orig_sr = sf.read(audio_path, dtype='float32')
+        source_name = audio_path if is_path else getattr(audio_path, "name", None)
+        return extract_features_from_array(y, orig_sr, sr=sr, n_mfcc=n_mfcc, source_name=source_name)
         
     except Exception as e:
         import traceback
@@ -85,6 +47,192 @@ def extract_features(audio_path, sr=16000, n_mfcc=40):
         print(traceback.format_exc())
         return None
 
+def extract_features_from_array(y, orig_sr, sr=16000, n_mfcc=40, source_name=None):
+    """
+    Same features as extract_features() for audio that is already decoded in memory.
+    source_name (a path or filename) only feeds the "filename" and "label" fields.
+    """
+    try:
+        y = _normalize_for_features(y, orig_sr)
+        return _features_from_normalized(y, sr, n_mfcc, source_name)
+        
+    except Exception as e:
+        import traceback
+        print(f"Error processing {source_name or 'audio buffer'}: {e}")
+        print(traceback.format_exc())
+        return None
+
+def _normalize_for_features(y, orig_sr):
+    y = np.asarray(y, dtype=np.float32)
+    
+    # If stereo, librosa to_mono expects shape (2, n), soundfile gives (n, 2)
+    if len(y.shape) > 1:
+        y = y.mean(axis=1)
+        
+    # Normalize to exactly 3.5 seconds
+    y, _ = normalize_audio(y, orig_sr, target_duration=3.5)
+    return y
+
+@lru_cache(maxsize=4)
+def _gpu_mfcc_transform(sr, n_mfcc):
+    """
+    torchaudio MFCC on CUDA, configured to match librosa.feature.mfcc's defaults
+    (2048/512 STFT, 128 Slaney mels, power dB with top_db=80, ortho DCT).
+    None when torch/torchaudio or a GPU is unavailable, or FEATURE_GPU_MFCC=0.
+    """
+    if os.environ.get("FEATURE_GPU_MFCC", "1") == "0":
+        return None
+    try:
+        import torch
+        import torchaudio
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+    return torchaudio.transforms.MFCC(
+        sample_rate=sr, n_mfcc=n_mfcc, norm="ortho", log_mels=False,
+        melkwargs={"n_fft": 2048, "hop_length": 512, "n_mels": 128, "center": True,
+                   "pad_mode": "constant", "norm": "slaney", "mel_scale": "slaney"}
+    ).to("cuda")
+
+def _mfcc(y, S, sr, n_mfcc):
+    """
+    (n_mfcc, frames) float32 MFCCs, on the GPU when one is available.
+    S is the magnitude STFT of y, shared with the spectral features.
+    """
+    transform = _gpu_mfcc_transform(sr, n_mfcc)
+    if transform is None:
+        mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr)
+        return librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=n_mfcc).astype(np.float32, copy=False)
+    import torch
+    with torch.inference_mode():
+        y_t = torch.from_numpy(np.ascontiguousarray(y, dtype=np.float32)).to("cuda")
+        mfccs = transform(y_t)
+    return mfccs.cpu().numpy()
+
+def _features_from_normalized(y, sr, n_mfcc, source_name):
+    """
+    Feature dict for one normalized clip. The magnitude STFT is computed once
+    and shared by the MFCC and spectral features.
+    """
+    features: Dict[str, Any] = {}
+    S = np.abs(librosa.stft(y))
+    
+    # 1. Extract MFCCs
+    mfccs = _mfcc(y, S, sr, n_mfcc)
+    mfccs_delta = librosa.feature.delta(mfccs)
+    
+    # Vector statistics stay ndarrays; _json_default converts them only
+    # when a dict is written to the cache or features.json
+    features["mfcc_mean"] = mfccs.mean(axis=1)
+    features["mfcc_std"] = mfccs.std(axis=1)
+    features["mfcc_delta_mean"] = mfccs_delta.mean(axis=1)
+    
+    # 2. Extract Spectral Features
+    spectral_centroid = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
+    spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)[0]
+    spectral_contrast = librosa.feature.spectral_contrast(S=S, sr=sr)
+    
+    features["spectral_centroid_mean"] = float(spectral_centroid.mean())
+    features["spectral_centroid_std"] = float(spectral_centroid.std())
+    features["spectral_bandwidth_mean"] = float(spectral_bandwidth.mean())
+    features["spectral_bandwidth_std"] = float(spectral_bandwidth.std())
+    features["spectral_contrast_mean"] = spectral_contrast.mean(axis=1)
+    features["spectral_contrast_std"] = spectral_contrast.std(axis=1)
+    
+    # 3. Phase Analysis (CRUCIAL for AI Detection)
+    phase_metrics = calculate_phase_discontinuity(y)
+    for k, v in phase_metrics.items():
+        features[f"phase_{k}"] = v
+        
+    # 4. Zero Crossing Rate (AI Detection)
+    zcr = librosa.feature.zero_crossing_rate(y)[0]
+    features["zero_crossing_rate_mean"] = float(zcr.mean())
+    features["zero_crossing_rate_std"] = float(zcr.std())
+        
+    # 5. Jitter
+    features["jitter"] = calculate_jitter(y, sr)
+    
+    # File info
+    features["filename"] = Path(source_name).name if source_name else None
+    
+    # Add labels if available (e.g. dataset directory names)
+    path_str = str(source_name or "").lower()
+    if 'real' in path_str:
+        features['label'] = 'real'
+    elif 'fake' in path_str or 'ai' in path_str:
+        features['label'] = 'fake'
+    else:
+        features['label'] = None
+        
+    return features
+
+def _json_default(obj):
+    """json.dump fallback for the ndarray statistics in a feature dict."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(obj):
+    """
+    Compact JSON bytes for a feature dict. orjson, when installed, writes the
+    ndarray statistics directly (OPT_SERIALIZE_NUMPY) instead of going through
+    .tolist() and a Python-level default= callback per array.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_json_default).encode()
+
+def _arrays_from_json(features):
+    """Inverse of _json_default for a cached feature dict: lists back to arrays."""
+    return {k: np.asarray(v) if isinstance(v, list) else v
+            for k, v in features.items()}
+
+def _feature_cache_path(audio_path, sr, n_mfcc):
+    stat = os.stat(audio_path)
+    mfcc_backend = "cpu" if _gpu_mfcc_transform(sr, n_mfcc) is None else "cuda"
+    key = (f"{os.path.abspath(audio_path)}|{stat.st_mtime_ns}|{stat.st_size}|{sr}|{n_mfcc}"
+           f"|v{FEATURE_VERSION}|{mfcc_backend}")
+    return os.path.join(FEATURE_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+def extract_features_cached(audio_path, sr=16000, n_mfcc=40):
+    """
+    extract_features() backed by the on-disk cache in FEATURE_CACHE_DIR.
+    The dataset wavs never change between runs, so repeat extractions become a small JSON read.
+    """
+    if not os.path.exists(audio_path):
+        return extract_features(audio_path, sr=sr, n_mfcc=n_mfcc)
+
+    cache_path = _feature_cache_path(audio_path, sr, n_mfcc)
+    if os.environ.get("FEATURE_CACHE_REGENERATE") != "1" and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                return _arrays_from_json(json.load(f))
+        except (OSError, ValueError):
+            pass  # Corrupt/partial entry, fall through and rebuild it
+
+    features = extract_features(audio_path, sr=sr, n_mfcc=n_mfcc)
+    if features is not None:
+        os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(features, f, default=_json_default)
+        os.replace(tmp_path, cache_path)
+    return features
+
+def extract_features_batch(audio_paths, n_jobs=-1, batch_size="auto"):
+    """
+    Extract features for many files at once, fanning out across processes.
+    STFT/pyin work is CPU-bound, so separate workers scale with core count.
+    Goes through the on-disk feature cache, so unchanged files are not re-extracted.
+    Returns a list aligned with audio_paths (None for files that failed).
+    """
+    return Parallel(n_jobs=n_jobs, batch_size=batch_size)(
+        delayed(extract_features_cached)(f) for f in tqdm(audio_paths, desc="Extracting")
+    )
+
 def process_dataset_parallel(data_dir, output_file='features.json', n_jobs=-1):
     """
     Process all .wav files in a directory in parallel using joblib.
@@ -107,9 +255,7 @@ def process_dataset_parallel(data_dir, output_file='features.json', n_jobs=-1):
     print(f"Found {len(wav_files)} files. Extracting features...")
     
     # Process files in parallel
-    results = Parallel(n_jobs=n_jobs)(
-        delayed(extract_features)(f) for f in tqdm(wav_files, desc="Extracting")
-    )
+    results = extract_features_batch(wav_files, n_jobs=n_jobs)
     
     # Filter out failed extractions
     valid_results = [r for r in results if r is not None]
@@ -118,8 +264,16 @@ def process_dataset_parallel(data_dir, output_file='features.json', n_jobs=-1):
         # Avoid creating massive lists if we just need a dict mapping
         feature_dict = {r["filename"]: r for r in valid_results}
         
-        with open(output_file, 'w') as f:
-            json.dump(feature_dict, f, indent=4)
+        # Stream one compact record per line (still a single JSON object).
+        # indent= would force json's pure-Python encoder; per-record dumps
+        # never build the whole document in memory
+        with open(output_file, 'wb') as f:
+            f.write(b"{\n")
+            for i, (filename, features) in enumerate(feature_dict.items()):
+                if i:
+                    f.write(b",\n")
+                f.write(_dumps(filename) + b": " + _dumps(features))
+            f.write(b"\n}\n")
             
         print(f"Successfully extracted features for {len(valid_results)} files. Saved to {output_file}")
         return feature_dict
@@ -1,8 +1,7 @@
-import os
 import json
 import librosa
 from backend.audio_normalizer import normalize_audio
-from backend.feature_extraction_fast import extract_features
+from backend.feature_extraction_fast import extract_features, extract_features_from_array
 
 class RealtimeVoiceDetector:
     """
@@ -11,16 +10,29 @@ class RealtimeVoiceDetector:
     def __init__(self):
         self.baseline_features = None
 
-    def set_baseline(self, audio_file_path):
+    def set_baseline(self, audio_source):
         """
         Extracts features from an audio file to use as the signature.
+        audio_source is a path or a binary file-like object (e.g. io.BytesIO).
         """
-        features = extract_features(audio_file_path)
+        features = extract_features(audio_source)
         if features:
             self.baseline_features = features
             return True
         return False
 
+    @staticmethod
+    def extract_chunk_features(y, sr):
+        """
+        Feature extraction step of analyze_chunk, independent of the baseline
+        so callers can cache it per recording.
+        """
+        # Normalize audio chunk
+        y_norm, norm_sr = normalize_audio(y, sr, target_duration=3.5)
+        
+        # Extract features straight from the normalized samples
+        return extract_features_from_array(y_norm, norm_sr)
+
     def analyze_chunk(self, y, sr):
         """
         Analyzes a chunk of audio against the set baseline.
@@ -28,19 +40,7 @@ class RealtimeVoiceDetector:
         if self.baseline_features is None:
             return {"error": "Baseline not set"}
 
-        # Normalize audio chunk
-        y_norm, norm_sr = normalize_audio(y, sr, target_duration=3.5)
-        
-        # Save temp file to reuse existing extraction flow
-        temp_file = "temp_chunk.wav"
-        import soundfile as sf
-        sf.write(temp_file, y_norm, norm_sr)
-        
-        # Extract features
-        features = extract_features(temp_file)
-        
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        features = self.extract_chunk_features(y, sr)
 
         if not features:
             return {"error": "Failed to extract features from test audio"}
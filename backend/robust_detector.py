@@ -1,5 +1,9 @@
 import numpy as np
 
+# Deviation scales, stored as reciprocals (multiply instead of divide per call)
+_INV_SPEC_SCALE = 1.0 / 0.60   # lenient spectral scaling (from analysis doc)
+_INV_PHASE_SCALE = 1.0 / 1.0   # lenient phase scaling (from analysis doc)
+
 class RobustVoiceDetector:
     """
     Compares test audio features against a baseline signature.
@@ -24,6 +28,21 @@ class RobustVoiceDetector:
 
     def set_baseline(self, baseline_features):
         self.baseline = baseline_features
+        # Freeze the baseline values analyze() compares against, so each call
+        # only converts the test features
+        if baseline_features:
+            self._baseline_mfcc = np.asarray(baseline_features.get("mfcc_mean", []), dtype=np.float64)
+            self._baseline_mfcc_abs = np.abs(self._baseline_mfcc)
+            self._spec_base = baseline_features.get("spectral_centroid_mean", 0)
+            self._phase_base = baseline_features.get("phase_discontinuity_mean", 0)
+
+    def _mfcc_similarity(self, test_mfcc):
+        """_calc_similarity against the precomputed baseline MFCC vector."""
+        test_mfcc = np.asarray(test_mfcc, dtype=np.float64)
+        diff = np.abs(test_mfcc - self._baseline_mfcc)
+        max_val = np.maximum(self._baseline_mfcc_abs, np.abs(test_mfcc))
+        max_val[max_val == 0] = 1e-10
+        return float(1.0 - np.mean(diff / max_val))
 
     def _calc_similarity(self, v1, v2):
         """Helper to calculate similarity between vectors/scalars"""
@@ -43,23 +62,23 @@ class RobustVoiceDetector:
             return {"error": "Baseline not set"}
 
         # 1. MFCC Deviation (Speaker Identity)
-        mfcc_sim = self._calc_similarity(self.baseline.get("mfcc_mean", []), test_features.get("mfcc_mean", []))
+        mfcc_sim = self._mfcc_similarity(test_features.get("mfcc_mean", []))
         mfcc_dev = max(0.0, 1.0 - mfcc_sim)
         
         # 2. Spectral Deviation (Voice Characteristics)
-        spec_base = self.baseline.get("spectral_centroid_mean", 0)
+        spec_base = self._spec_base
         spec_test = test_features.get("spectral_centroid_mean", 0)
         spec_diff = abs(spec_test - spec_base) / max(spec_base, 1e-10)
         # Lenient scaling for spectral (from analysis doc)
-        spec_dev = min(1.0, spec_diff / 0.60)
+        spec_dev = min(1.0, spec_diff * _INV_SPEC_SCALE)
         spec_sim = 1.0 - spec_diff
 
         # 3. Phase Continuity Deviation (AI vs Human)
-        phase_base = self.baseline.get("phase_discontinuity_mean", 0)
+        phase_base = self._phase_base
         phase_test = test_features.get("phase_discontinuity_mean", 0)
         phase_diff = abs(phase_test - phase_base)
         # Lenient scaling (from analysis doc)
-        phase_dev = min(1.0, phase_diff / 1.0)
+        phase_dev = min(1.0, phase_diff * _INV_PHASE_SCALE)
         phase_sim = self._calc_similarity(phase_base, phase_test)
 
         # Total Deviation
@@ -69,6 +88,62 @@ class RobustVoiceDetector:
             (spec_dev * self.weights["spectral"])
         )
 
+        return self._verdict(test_features, strictness, mfcc_sim, spec_sim, spec_diff,
+                             phase_test, phase_sim, weighted_deviation)
+
+    def analyze_batch(self, test_features_list, strictness="normal"):
+        """
+        analyze() for a list of feature dicts. The similarity and deviation terms
+        are computed for the whole batch as arrays; only the rule-based verdict
+        runs per item. Returns a list of analyze()-style results, in order.
+        """
+        if not self.baseline:
+            return [{"error": "Baseline not set"} for _ in test_features_list]
+        if not test_features_list:
+            return []
+
+        try:
+            mfcc = np.array([f.get("mfcc_mean", []) for f in test_features_list], dtype=np.float64)
+        except ValueError:
+            mfcc = None  # Ragged MFCC vectors
+        if mfcc is None or mfcc.ndim != 2 or mfcc.shape[1] != len(self._baseline_mfcc):
+            return [self.analyze(f, strictness) for f in test_features_list]
+
+        # 1. MFCC Deviation (Speaker Identity), one row per clip
+        max_val = np.maximum(self._baseline_mfcc_abs, np.abs(mfcc))
+        max_val[max_val == 0] = 1e-10
+        mfcc_sim = 1.0 - np.mean(np.abs(mfcc - self._baseline_mfcc) / max_val, axis=1)
+        mfcc_dev = np.maximum(0.0, 1.0 - mfcc_sim)
+
+        # 2. Spectral Deviation (Voice Characteristics)
+        spec_test = np.array([f.get("spectral_centroid_mean", 0) for f in test_features_list], dtype=np.float64)
+        spec_diff = np.abs(spec_test - self._spec_base) / max(self._spec_base, 1e-10)
+        spec_dev = np.clip(spec_diff * _INV_SPEC_SCALE, None, 1.0)
+        spec_sim = 1.0 - spec_diff
+
+        # 3. Phase Continuity Deviation (AI vs Human)
+        phase_test = np.array([f.get("phase_discontinuity_mean", 0) for f in test_features_list], dtype=np.float64)
+        phase_diff = np.abs(phase_test - self._phase_base)
+        phase_dev = np.clip(phase_diff * _INV_PHASE_SCALE, None, 1.0)
+        phase_max = np.maximum(abs(self._phase_base), np.abs(phase_test))
+        phase_sim = 1.0 - phase_diff / np.where(phase_max == 0, 1e-10, phase_max)
+
+        # Total Deviation
+        weighted_deviation = (
+            (mfcc_dev * self.weights["mfcc"]) +
+            (phase_dev * self.weights["phase"]) +
+            (spec_dev * self.weights["spectral"])
+        )
+
+        return [
+            self._verdict(features, strictness, float(mfcc_sim[i]), float(spec_sim[i]), float(spec_diff[i]),
+                          float(phase_test[i]), float(phase_sim[i]), float(weighted_deviation[i]))
+            for i, features in enumerate(test_features_list)
+        ]
+
+    def _verdict(self, test_features, strictness, mfcc_sim, spec_sim, spec_diff,
+                 phase_test, phase_sim, weighted_deviation):
+        """AI-indicator and identity rules shared by analyze() and analyze_batch()."""
         threshold = self.levels.get(strictness, self.levels["normal"])
         
         # Initialize variables
@@ -109,7 +184,7 @@ class RobustVoiceDetector:
         
         # 4. MFCC uniformity (AI produces too uniform patterns)
         mfcc_std = test_features.get("mfcc_std", [])
-        if mfcc_std and np.mean(mfcc_std) < 8:  # Human speech has more variation
+        if len(mfcc_std) and np.mean(mfcc_std) < 8:  # Human speech has more variation
             ai_indicators += 1
             ai_reasons.append("Voice patterns unnaturally uniform")
         
@@ -125,7 +200,7 @@ class RobustVoiceDetector:
         
         # 6. Spectral contrast (harmonic structure)
         spec_contrast_std = test_features.get("spectral_contrast_std", [])
-        if spec_contrast_std and np.mean(spec_contrast_std) < 2:
+        if len(spec_contrast_std) and np.mean(spec_contrast_std) < 2:
             ai_indicators += 1
             ai_reasons.append("Harmonic structure too perfect")
         
@@ -3,8 +3,9 @@ Speaker Verification System using MFCC
 Verifies if a test voice matches the authenticated user's signature.
 """
 
+import math
 import numpy as np
-from scipy.spatial.distance import cosine, euclidean
+from scipy.spatial.distance import cosine
 from sklearn.metrics.pairwise import cosine_similarity
 import logging
 
@@ -43,9 +44,9 @@ class SpeakerVerifier:
             bool: Success status
         """
         try:
-            mfcc_mean = np.array(mfcc_features.get('mfcc_mean', []))
-            mfcc_std = np.array(mfcc_features.get('mfcc_std', []))
-            mfcc_delta = np.array(mfcc_features.get('mfcc_delta_mean', []))
+            mfcc_mean = np.asarray(mfcc_features.get('mfcc_mean', []), dtype=np.float32)
+            mfcc_std = np.asarray(mfcc_features.get('mfcc_std', []), dtype=np.float32)
+            mfcc_delta = np.asarray(mfcc_features.get('mfcc_delta_mean', []), dtype=np.float32)
             
             if len(mfcc_mean) == 0:
                 logger.error("MFCC features are empty")
@@ -59,10 +60,11 @@ class SpeakerVerifier:
             }
             
             # Calculate statistics for normalization
+            # (computed once here as plain floats so verification never recomputes them)
             self.signature_stats = {
-                'mean_norm': np.linalg.norm(mfcc_mean),
-                'std_norm': np.linalg.norm(mfcc_std),
-                'delta_norm': np.linalg.norm(mfcc_delta)
+                'mean_norm': math.sqrt(float(np.vdot(mfcc_mean, mfcc_mean))),
+                'std_norm': math.sqrt(float(np.vdot(mfcc_std, mfcc_std))),
+                'delta_norm': math.sqrt(float(np.vdot(mfcc_delta, mfcc_delta)))
             }
             
             logger.info(f"Speaker enrolled successfully. MFCC dimensions: {len(mfcc_mean)}")
@@ -91,9 +93,9 @@ class SpeakerVerifier:
         
         try:
             # Extract test features
-            test_mean = np.array(test_mfcc_features.get('mfcc_mean', []))
-            test_std = np.array(test_mfcc_features.get('mfcc_std', []))
-            test_delta = np.array(test_mfcc_features.get('mfcc_delta_mean', []))
+            test_mean = np.asarray(test_mfcc_features.get('mfcc_mean', []), dtype=np.float32)
+            test_std = np.asarray(test_mfcc_features.get('mfcc_std', []), dtype=np.float32)
+            test_delta = np.asarray(test_mfcc_features.get('mfcc_delta_mean', []), dtype=np.float32)
             
             if len(test_mean) == 0:
                 return {
@@ -172,7 +174,8 @@ class SpeakerVerifier:
         if len(vec1) != len(vec2):
             return 1.0
         
-        distance = euclidean(vec1, vec2)
+        diff = vec1 - vec2
+        distance = math.sqrt(float(np.vdot(diff, diff)))
         normalized = distance / (norm_factor + 1e-10)
         return min(1.0, normalized)
     
@@ -193,37 +196,26 @@ def calculate_eer(genuine_scores, impostor_scores):
     Returns:
         dict: EER and related metrics
     """
-    # Combine scores with labels
-    scores = np.concatenate([genuine_scores, impostor_scores])
-    labels = np.concatenate([
-        np.ones(len(genuine_scores)),   # 1 = genuine
-        np.zeros(len(impostor_scores))  # 0 = impostor
-    ])
+    genuine_scores = np.asarray(genuine_scores, dtype=float)
+    impostor_scores = np.asarray(impostor_scores, dtype=float)
+    n_genuine = len(genuine_scores)
+    n_impostor = len(impostor_scores)
     
-    # Sort by score
-    sorted_indices = np.argsort(scores)
-    sorted_scores = scores[sorted_indices]
-    sorted_labels = labels[sorted_indices]
+    # Every observed score is a candidate threshold
+    thresholds = np.sort(np.concatenate([genuine_scores, impostor_scores]))
     
-    # Calculate FAR and FRR for different thresholds
-    thresholds = sorted_scores
-    far_list = []
-    frr_list = []
+    # With both classes sorted, the number of scores below each threshold is
+    # a binary search, so the whole FAR/FRR curve costs two searchsorted calls
+    sorted_genuine = np.sort(genuine_scores)
+    sorted_impostor = np.sort(impostor_scores)
     
-    for threshold in thresholds:
-        # False Accept Rate: impostors accepted (score >= threshold)
-        impostor_accepted = np.sum((scores >= threshold) & (labels == 0))
-        far = impostor_accepted / len(impostor_scores) if len(impostor_scores) > 0 else 0
-        
-        # False Reject Rate: genuines rejected (score < threshold)
-        genuine_rejected = np.sum((scores < threshold) & (labels == 1))
-        frr = genuine_rejected / len(genuine_scores) if len(genuine_scores) > 0 else 0
-        
-        far_list.append(far)
-        frr_list.append(frr)
+    # False Accept Rate: impostors accepted (score >= threshold)
+    impostor_accepted = n_impostor - np.searchsorted(sorted_impostor, thresholds, side='left')
+    far_array = impostor_accepted / n_impostor if n_impostor > 0 else np.zeros(len(thresholds))
     
-    far_array = np.array(far_list)
-    frr_array = np.array(frr_list)
+    # False Reject Rate: genuines rejected (score < threshold)
+    genuine_rejected = np.searchsorted(sorted_genuine, thresholds, side='left')
+    frr_array = genuine_rejected / n_genuine if n_genuine > 0 else np.zeros(len(thresholds))
     
     # Find EER (where FAR = FRR)
     diff = np.abs(far_array - frr_array)
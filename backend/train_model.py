@@ -2,21 +2,24 @@ import json
 import os
 import numpy as np
 
-def build_simple_classifier(features_file="features.json", output_file="classifier_params.json"):
+def build_simple_classifier(features_file="features.json", output_file="classifier_params.json", data=None):
     """
     Builds a simple threshold-based classifier for AI detection based on Phase Discontinuity.
     This reads from features.json and generates classifier_params.json.
+    Pass data (the {filename: features} dict process_dataset_parallel returns)
+    to skip re-reading features.json that was just written.
     """
-    if not os.path.exists(features_file):
-        print(f"Error: Features file {features_file} not found.")
-        return False
-        
-    try:
-        with open(features_file, 'r') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"Error loading {features_file}: {e}")
-        return False
+    if data is None:
+        if not os.path.exists(features_file):
+            print(f"Error: Features file {features_file} not found.")
+            return False
+            
+        try:
+            with open(features_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading {features_file}: {e}")
+            return False
 
     if not data:
         print("Data is empty.")
@@ -7,7 +7,10 @@ def calculate_jitter(y, sr):
     Returns a small float or 0 if extraction fails.
     """
     try:
-        f0, voiced_flag, _ = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'), sr=sr)
+        # Speech F0 sits well inside 75-500 Hz (Praat's periodic range), so a
+        # narrower pitch grid keeps pyin's Viterbi cheap. Frame and hop stay at
+        # librosa's defaults: they set the period resolution jitter is measured at
+        f0, voiced_flag, _ = librosa.pyin(y, fmin=75.0, fmax=500.0, sr=sr)
         
         # Get only the voiced frames
         f0_voiced = f0[voiced_flag]
@@ -39,19 +42,19 @@ def calculate_phase_discontinuity(y, n_fft=2048, hop_length=512):
     This is extremely important for detecting AI generated voices.
     """
     try:
-        # Compute STFT
-        D = librosa.stft(y, n_fft=n_fft, hop_length=hop_length)
+        # Compute STFT (kept in float32/complex64 to halve memory traffic)
+        D = librosa.stft(y.astype(np.float32, copy=False), n_fft=n_fft, hop_length=hop_length)
         
         # Get phase
-        phase = np.angle(D)
+        phase = np.angle(D).astype(np.float32, copy=False)
         
         # Unwrap phase along time axis (axis=1)
-        unwrapped_phase = np.unwrap(phase, axis=1)
+        unwrapped_phase = np.unwrap(phase, axis=1).astype(np.float32, copy=False)
         
         # Compute second derivative of phase (phase acceleration)
         # Phase jumps often occur when vocoders synthetically generate audio
-        phase_diff = np.diff(unwrapped_phase, axis=1)
-        phase_diff2 = np.diff(phase_diff, axis=1)
+        phase_diff = np.diff(unwrapped_phase, axis=1).astype(np.float32, copy=False)
+        phase_diff2 = np.diff(phase_diff, axis=1).astype(np.float32, copy=False)
         
         # Calculate mean absolute discontinuity across frequency bins and time
         discontinuity = np.mean(np.abs(phase_diff2))
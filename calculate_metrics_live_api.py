@@ -1,138 +1,214 @@
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
 import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from sklearn.metrics import roc_curve, auc
 import matplotlib.pyplot as plt
 
 API_URL = "https://polyglot-ghost-api.onrender.com"
+MAX_WORKERS = 8
+
+# One pooled session for every request: the TLS connection to Render is
+# opened once and kept alive instead of being renegotiated per upload
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+session.headers.update({'Connection': 'keep-alive'})
+
+
+def analyze_file(filepath):
+    """POST one wav to /api/analyze and return the parsed JSON, or None on an HTTP error."""
+    with open(filepath, 'rb') as f:
+        files = {'file': f}
+        response = session.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+
+def analyze_batch(filepaths):
+    """POST every wav in one /api/analyze-batch request; results are aligned with filepaths."""
+    handles = [open(path, 'rb') for path in filepaths]
+    try:
+        files = [('files', (os.path.basename(path), handle, 'audio/wav')) for path, handle in zip(filepaths, handles)]
+        response = session.post(f"{API_URL}/api/analyze-batch?strictness=normal", files=files, timeout=600)
+    finally:
+        for handle in handles:
+            handle.close()
+    response.raise_for_status()
+    return [result if result.get('success') else None for result in response.json()['results']]
+
+
+def existing_files(directory, filenames):
+    """(filename, path) pairs for the files that are present on disk."""
+    return [(filename, f'{directory}/{filename}') for filename in filenames if os.path.exists(f'{directory}/{filename}')]
+
+
+def collect_results(entries, results_iter):
+    """Pull one result per (filename, path) entry from results_iter, in order, and print each verdict."""
+    results = []
+    for (filename, _), result in zip(entries, results_iter):
+        if result is None:
+            continue
+        results.append({
+            'file': filename,
+            'is_match': result['is_match'],
+            'is_ai': result['is_ai_generated'],
+            'confidence': result['confidence'],
+            'verdict': result['verdict']
+        })
+        print(f"  {filename}: Match={result['is_match']}, AI={result['is_ai_generated']}, Conf={result['confidence']:.1%}")
+    return results
+
+
+def local_pipeline(baseline_path):
+    """
+    Same detector pair the API runs, in-process: returns an analyze(path) callable,
+    or None if the baseline could not be extracted.
+    """
+    import soundfile as sf
+    from backend.realtime_detector import RealtimeVoiceDetector
+    from backend.robust_detector import RobustVoiceDetector
+
+    detector = RealtimeVoiceDetector()
+    robust_detector = RobustVoiceDetector()
+    if not detector.set_baseline(baseline_path):
+        return None
+    robust_detector.set_baseline(detector.baseline_features)
+
+    def analyze(filepath):
+        # Decode exactly as the API's _decode_contents does
+        y, sr = sf.read(filepath, dtype='float32')
+        if len(y.shape) > 1:
+            y = y.mean(axis=1, dtype=np.float32)
+        result = detector.analyze_chunk(y, sr)
+        if "error" in result:
+            return None
+        robust_res = robust_detector.analyze(result["features"], strictness="normal")
+        return {
+            'is_match': robust_res['is_match'],
+            'is_ai_generated': robust_res['is_ai_generated'],
+            'confidence': float(robust_res['confidence']),
+            'verdict': robust_res['verdict']
+        }
+    return analyze
+
+
+parser = argparse.ArgumentParser(description="Accuracy / EER metrics against the live API")
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument('--batch', action='store_true', help="send all probes in a single /api/analyze-batch request")
+mode.add_argument('--local', action='store_true', help="run the API's detector pipeline in-process instead of over HTTP")
+args = parser.parse_args()
 
 print("=" * 80)
 print("CALCULATING ACCURACY AND EER FOR AI VS. HUMAN DETECTION")
 print("=" * 80)
 
+# One pool for the warm-up and the probes; the with block in steps 2-5 shuts it down
+pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+# Wake the (possibly cold-started) Render instance in the background; the
+# probe listing below overlaps with it and the TLS connection it opens is
+# reused by the baseline POST
+warmup = None
+if not args.local:
+    warmup = pool.submit(session.get, f"{API_URL}/health", timeout=90)
+
+# Probe files for steps 2-5
+SUITES = [
+    ('real_same', "🗣️ Testing Real Voices (Same Speaker)...", 'dataset/real', ['clip_1.wav', 'clip_2.wav', 'clip_3.wav', 'clip_4.wav', 'clip_5.wav']),
+    ('real_diff', "👥 Testing Real Voices (Different Speakers)...", 'dataset/real', ['Furqanreal.wav', 'HimanshuReal.wav']),
+    ('ai_dataset', "🤖 Testing AI Voices (Dataset)...", 'dataset/fake', ['Ali.wav', 'Connor.wav', 'David.wav', 'Jack.wav', 'Mark.wav']),
+    ('elevenlabs', "🎙️ Testing ElevenLabs AI Clones...", 'test_results/elevenlabs_test', [f'ai_clone_{i}.wav' for i in range(5)]),
+]
+suite_entries = {key: existing_files(root, names) for key, _, root, names in SUITES}
+all_paths = [path for entries in suite_entries.values() for _, path in entries]
+
 # Step 1: Set Baseline
 print("\n📌 Setting Baseline Voice...")
-with open('dataset/real/clip_0.wav', 'rb') as f:
-    files = {'file': f}
-    response = requests.post(f"{API_URL}/api/set-baseline", files=files, timeout=120)
-    if response.status_code == 200:
-        print("✅ Baseline set successfully")
-    else:
+if args.local:
+    analyze_local = local_pipeline('dataset/real/clip_0.wav')
+    if analyze_local is None:
         print("❌ Failed to set baseline")
         exit(1)
-
-# Step 2: Test Real Voices (Same Speaker)
-print("\n🗣️ Testing Real Voices (Same Speaker)...")
-real_same_results = []
-real_same_files = ['clip_1.wav', 'clip_2.wav', 'clip_3.wav', 'clip_4.wav', 'clip_5.wav']
-
-for filename in real_same_files:
-    filepath = f'dataset/real/{filename}'
-    if os.path.exists(filepath):
-        with open(filepath, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
-            if response.status_code == 200:
-                result = response.json()
-                real_same_results.append({
-                    'file': filename,
-                    'is_match': result['is_match'],
-                    'is_ai': result['is_ai_generated'],
-                    'confidence': result['confidence'],
-                    'verdict': result['verdict']
-                })
-                print(f"  {filename}: Match={result['is_match']}, AI={result['is_ai_generated']}, Conf={result['confidence']:.1%}")
-
-# Step 3: Test Real Voices (Different Speakers)
-print("\n👥 Testing Real Voices (Different Speakers)...")
-real_diff_results = []
-real_diff_files = ['Furqanreal.wav', 'HimanshuReal.wav']
-
-for filename in real_diff_files:
-    filepath = f'dataset/real/{filename}'
-    if os.path.exists(filepath):
-        with open(filepath, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
-            if response.status_code == 200:
-                result = response.json()
-                real_diff_results.append({
-                    'file': filename,
-                    'is_match': result['is_match'],
-                    'is_ai': result['is_ai_generated'],
-                    'confidence': result['confidence'],
-                    'verdict': result['verdict']
-                })
-                print(f"  {filename}: Match={result['is_match']}, AI={result['is_ai_generated']}, Conf={result['confidence']:.1%}")
-
-# Step 4: Test AI Voices (Dataset)
-print("\n🤖 Testing AI Voices (Dataset)...")
-ai_dataset_results = []
-ai_files = ['Ali.wav', 'Connor.wav', 'David.wav', 'Jack.wav', 'Mark.wav']
-
-for filename in ai_files:
-    filepath = f'dataset/fake/{filename}'
-    if os.path.exists(filepath):
-        with open(filepath, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
-            if response.status_code == 200:
-                result = response.json()
-                ai_dataset_results.append({
-                    'file': filename,
-                    'is_match': result['is_match'],
-                    'is_ai': result['is_ai_generated'],
-                    'confidence': result['confidence'],
-                    'verdict': result['verdict']
-                })
-                print(f"  {filename}: Match={result['is_match']}, AI={result['is_ai_generated']}, Conf={result['confidence']:.1%}")
-
-# Step 5: Test ElevenLabs AI Clones
-print("\n🎙️ Testing ElevenLabs AI Clones...")
-elevenlabs_results = []
-
-for i in range(5):
-    filepath = f'test_results/elevenlabs_test/ai_clone_{i}.wav'
-    if os.path.exists(filepath):
-        with open(filepath, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
-            if response.status_code == 200:
-                result = response.json()
-                elevenlabs_results.append({
-                    'file': f'ai_clone_{i}.wav',
-                    'is_match': result['is_match'],
-                    'is_ai': result['is_ai_generated'],
-                    'confidence': result['confidence'],
-                    'verdict': result['verdict']
-                })
-                print(f"  ai_clone_{i}.wav: Match={result['is_match']}, AI={result['is_ai_generated']}, Conf={result['confidence']:.1%}")
+    print("✅ Baseline set successfully (local)")
+else:
+    try:
+        warmup.result()
+    except requests.RequestException as e:
+        print(f"⚠️ Warm-up request failed ({e}); continuing")
+    with open('dataset/real/clip_0.wav', 'rb') as f:
+        files = {'file': f}
+        response = session.post(f"{API_URL}/api/set-baseline", files=files, timeout=120)
+        if response.status_code == 200:
+            print("✅ Baseline set successfully")
+        else:
+            print("❌ Failed to set baseline")
+            exit(1)
+
+# Steps 2-5: every probe is independent once the baseline is set, so they
+# either go out together in one batch request or are all submitted up front
+# to overlap their network/server time
+results = {}
+with pool:
+    if args.batch:
+        all_results = iter(analyze_batch(all_paths))
+    else:
+        # The local pipeline decodes in memory and only reads the shared
+        # baseline, so its probes can run on the pool too; librosa's FFT and
+        # numpy work release the GIL
+        analyze = analyze_local if args.local else analyze_file
+        futures = [pool.submit(analyze, path) for path in all_paths]
+        all_results = (future.result() for future in futures)
+
+    for key, header, _, _ in SUITES:
+        print(f"\n{header}")
+        results[key] = collect_results(suite_entries[key], all_results)
+
+real_same_results = results['real_same']
+real_diff_results = results['real_diff']
+ai_dataset_results = results['ai_dataset']
+elevenlabs_results = results['elevenlabs']
 
 # Calculate Metrics
 print("\n" + "=" * 80)
 print("📊 CALCULATING METRICS")
 print("=" * 80)
 
+# One (is_match, is_ai) boolean record array per bucket; every count below is a mask reduction
+def to_flags(results):
+    return np.array([(r['is_match'], r['is_ai']) for r in results], dtype=[('m', '?'), ('ai', '?')])
+
+real_same_flags = to_flags(real_same_results)
+real_diff_flags = to_flags(real_diff_results)
+ai_dataset_flags = to_flags(ai_dataset_results)
+elevenlabs_flags = to_flags(elevenlabs_results)
+
+# An AI probe counts as accepted only when it matched and was not flagged as AI
+ai_dataset_accepted = ai_dataset_flags['m'] & ~ai_dataset_flags['ai']
+elevenlabs_accepted = elevenlabs_flags['m'] & ~elevenlabs_flags['ai']
+
 # True Positives: Real voice (same speaker) correctly accepted
-tp = sum(1 for r in real_same_results if r['is_match'])
+tp = int(real_same_flags['m'].sum())
 # False Negatives: Real voice (same speaker) incorrectly rejected
-fn = sum(1 for r in real_same_results if not r['is_match'])
+fn = len(real_same_flags) - tp
 
 # True Negatives: Impostor/AI correctly rejected
-tn_diff = sum(1 for r in real_diff_results if not r['is_match'])
-tn_ai_dataset = sum(1 for r in ai_dataset_results if not r['is_match'] or r['is_ai'])
-tn_elevenlabs = sum(1 for r in elevenlabs_results if not r['is_match'] or r['is_ai'])
+tn_diff = int((~real_diff_flags['m']).sum())
+tn_ai_dataset = int((~ai_dataset_accepted).sum())
+tn_elevenlabs = int((~elevenlabs_accepted).sum())
 tn = tn_diff + tn_ai_dataset + tn_elevenlabs
 
 # False Positives: Impostor/AI incorrectly accepted
-fp_diff = sum(1 for r in real_diff_results if r['is_match'])
-fp_ai_dataset = sum(1 for r in ai_dataset_results if r['is_match'] and not r['is_ai'])
-fp_elevenlabs = sum(1 for r in elevenlabs_results if r['is_match'] and not r['is_ai'])
+fp_diff = len(real_diff_flags) - tn_diff
+fp_ai_dataset = int(ai_dataset_accepted.sum())
+fp_elevenlabs = int(elevenlabs_accepted.sum())
 fp = fp_diff + fp_ai_dataset + fp_elevenlabs
 
 # AI Detection Specific
-ai_detected_dataset = sum(1 for r in ai_dataset_results if r['is_ai'])
-ai_detected_elevenlabs = sum(1 for r in elevenlabs_results if r['is_ai'])
+ai_detected_dataset = int(ai_dataset_flags['ai'].sum())
+ai_detected_elevenlabs = int(elevenlabs_flags['ai'].sum())
 total_ai = len(ai_dataset_results) + len(elevenlabs_results)
 
 # Calculate rates
@@ -145,8 +221,38 @@ far = fp / total_negatives if total_negatives > 0 else 0  # False Acceptance Rat
 total_positives = tp + fn
 frr = fn / total_positives if total_positives > 0 else 0  # False Rejection Rate
 
-# EER calculation (simplified - where FAR = FRR)
-eer = (far + frr) / 2
+# EER from the ROC over a continuous acceptance score. For probes not flagged
+# as AI the API's confidence is 1 - weighted deviation (a match score); for
+# AI-flagged probes it is certainty of synthesis, so it counts against acceptance
+def acceptance_scores(results):
+    return np.array([-r['confidence'] if r['is_ai'] else r['confidence'] for r in results], dtype=float)
+
+impostor_results = real_diff_results + ai_dataset_results + elevenlabs_results
+y_true = np.concatenate([np.ones(len(real_same_results)), np.zeros(len(impostor_results))])
+y_score = np.concatenate([acceptance_scores(real_same_results), acceptance_scores(impostor_results)])
+
+if len(real_same_results) and len(impostor_results):
+    fpr, tpr, _ = roc_curve(y_true, y_score)
+    fnr = 1 - tpr
+    eer_idx = np.nanargmin(np.abs(fpr - fnr))
+    eer = (fpr[eer_idx] + fnr[eer_idx]) / 2
+    roc_auc = auc(fpr, tpr)
+
+    os.makedirs('test_results', exist_ok=True)
+    plt.figure(figsize=(6, 6))
+    plt.plot(fpr, tpr, label=f'ROC (AUC = {roc_auc:.3f})')
+    plt.plot([0, 1], [0, 1], 'k--', linewidth=0.8)
+    plt.scatter([fpr[eer_idx]], [tpr[eer_idx]], color='red', zorder=3, label=f'EER = {eer:.1%}')
+    plt.xlabel('False Acceptance Rate')
+    plt.ylabel('True Acceptance Rate')
+    plt.title('Live API ROC')
+    plt.legend(loc='lower right')
+    plt.savefig('test_results/roc_curve_live_api.png', dpi=150, bbox_inches='tight')
+    plt.close()
+else:
+    # Not enough classes for a curve; fall back to the single operating point
+    eer = (far + frr) / 2
+    roc_auc = float('nan')
 
 # AI Detection Rate
 ai_detection_rate = (ai_detected_dataset + ai_detected_elevenlabs) / total_ai if total_ai > 0 else 0
@@ -162,6 +268,7 @@ print(f"  Accuracy:                    {accuracy:.2%}")
 print(f"  False Acceptance Rate (FAR): {far:.2%}")
 print(f"  False Rejection Rate (FRR):  {frr:.2%}")
 print(f"  Equal Error Rate (EER):      {eer:.2%}")
+print(f"  ROC AUC:                     {roc_auc:.3f}")
 
 print("\n🤖 AI DETECTION METRICS:")
 print(f"  AI Voices Tested:            {total_ai}")
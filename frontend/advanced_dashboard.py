@@ -1,9 +1,9 @@
 import os
 import streamlit as st
 import librosa
-import librosa.display
 import numpy as np
-import matplotlib.pyplot as plt
+import soundfile as sf
+from matplotlib import colormaps
 
 import sys
 from pathlib import Path
@@ -31,13 +31,26 @@ if 'api' not in st.session_state:
 st.title("🛡️ Kural-Pulse: Voice Biometric & Anti-Spoofing")
 st.markdown("Advanced Banking Security via Deep Speaker Embeddings & Generative Artifact Detection")
 
-def plot_spectrogram(y, sr):
-    fig, ax = plt.subplots(figsize=(10, 4))
+def decode_upload(upload, target_sr=16000):
+    """Decode an st.audio_input upload straight from memory to a mono float32 signal at target_sr."""
+    upload.seek(0)
+    y, sr = sf.read(upload, dtype='float32')
+    if y.ndim > 1:
+        y = y.mean(axis=1)
+    if sr != target_sr:
+        y = librosa.resample(y, orig_sr=sr, target_sr=target_sr)
+    return y, target_sr
+
+@st.cache_data(max_entries=8)
+def spectrogram_image(y):
+    """
+    Spectrogram as an RGB uint8 image: dB STFT -> [0, 1] -> magma LUT, low frequencies at the bottom.
+    One vectorized pass instead of building a Matplotlib figure; memoized on the samples.
+    """
     D = librosa.amplitude_to_db(np.abs(librosa.stft(y)), ref=np.max)
-    img = librosa.display.specshow(D, y_axis='hz', x_axis='time', sr=sr, ax=ax)
-    fig.colorbar(img, ax=ax, format="%+2.0f dB")
-    ax.set_title('Live Spectrogram')
-    return fig
+    D_norm = (D - D.min()) / (D.max() - D.min() + 1e-9)
+    rgb = (colormaps["magma"](D_norm)[..., :3] * 255).astype(np.uint8)
+    return np.flipud(rgb)
 
 # UI TABS
 tab1, tab2, tab3 = st.tabs(["🔒 1. Enroll Signature", "🎙️ 2. Live Authentication", "👻 3. Attack Simulation"])
@@ -50,10 +63,8 @@ with tab1:
     
     if enroll_audio:
         if st.button("Extract Deep Signature"):
-            with open("temp_enroll.wav", "wb") as f:
-                f.write(enroll_audio.getbuffer())
             with st.spinner("Extracting Biological Blueprint (SpeechBrain)..."):
-                profile = extractor.get_full_profile("temp_enroll.wav")
+                profile = extractor.get_full_profile_array(*decode_upload(enroll_audio))
                 if profile and st.session_state.auth_engine.set_vocal_twin(profile):
                     st.success("✅ **Signature securely hashed and stored!** You are now enrolled.")
                     st.json({"identity_vector_length": len(profile['identity_embedding'])})
@@ -70,15 +81,12 @@ with tab2:
         test_audio = st.audio_input("Speak to Authenticate")
         if test_audio:
             if st.button("Authenticate Identity"):
-                with open("temp_test.wav", "wb") as f:
-                    f.write(test_audio.getbuffer())
-                    
                 with st.spinner("Analyzing Spectral Stitches & Extracting Identity..."):
-                    # Render Spectrogram
-                    y, sr = librosa.load("temp_test.wav", sr=16000)
-                    st.pyplot(plot_spectrogram(y, sr))
+                    # Decode once; the same samples feed the spectrogram and the extractor
+                    y, sr = decode_upload(test_audio)
+                    st.image(spectrogram_image(y), caption="Live Spectrogram", width="stretch")
                     
-                    test_profile = extractor.get_full_profile("temp_test.wav")
+                    test_profile = extractor.get_full_profile_array(y, sr)
                     
                     if test_profile:
                         # Auth Logic
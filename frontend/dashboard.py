@@ -1,6 +1,5 @@
-import os
 import streamlit as st
-import librosa
+from streamlit.runtime.uploaded_file_manager import UploadedFile
 import numpy as np
 
 # Add backend to path logic if needed
@@ -8,32 +7,77 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from backend.realtime_detector import RealtimeVoiceDetector
-from backend.robust_detector import RobustVoiceDetector
+# librosa/soundfile and the detector modules are imported lazily below: they
+# pull in scipy/numba/audioread, which would otherwise delay the first paint
 
 st.set_page_config(page_title="Polyglot Ghost Voice Auth", layout="wide")
 
+# Key cached decodes on the upload's file_id (unique per upload) rather than
+# hashing the whole WAV payload on every rerun
+@st.cache_data(max_entries=16, hash_funcs={UploadedFile: lambda f: f.file_id})
+def decode_audio(upload: UploadedFile):
+    """Decode an uploaded wav to mono samples once per distinct upload; reruns hit the cache."""
+    import soundfile as sf
+    # UploadedFile is a BytesIO: decode from it directly rather than copying its contents first
+    upload.seek(0)
+    y, sr = sf.read(upload, dtype='float32')
+    if len(y.shape) > 1:
+        y = y.mean(axis=1, dtype=np.float32) # Mono
+    return y, sr
+
+def _is_wav(b: bytes) -> bool:
+    """RIFF/WAVE magic check, so junk uploads are rejected before any decode or extraction."""
+    return len(b) >= 12 and b[:4] == b"RIFF" and b[8:12] == b"WAVE"
+
+def is_wav_upload(upload: UploadedFile) -> bool:
+    # getbuffer() is a view on the upload, so only the 12 header bytes are copied
+    return _is_wav(bytes(upload.getbuffer()[:12]))
+
+@st.cache_data(max_entries=16, hash_funcs={UploadedFile: lambda f: f.file_id}, show_spinner=False)
+def baseline_features(upload: UploadedFile):
+    """Signature features for one upload; re-clicking Set on the same recording is free."""
+    from backend.feature_extraction_fast import extract_features_from_array
+    return extract_features_from_array(*decode_audio(upload))
+
+@st.cache_data(max_entries=16, hash_funcs={UploadedFile: lambda f: f.file_id}, show_spinner=False)
+def test_features(upload: UploadedFile):
+    """Test-chunk features for one upload, so re-analysing at another strictness skips extraction."""
+    from backend.realtime_detector import RealtimeVoiceDetector
+    return RealtimeVoiceDetector.extract_chunk_features(*decode_audio(upload))
+
 st.title("The Polyglot Ghost Voice Authenticator")
 st.markdown("Authenticate whether the speaking voice matches the signature voice AND detect if it's an AI clone.")
 
-# Initialize detectors in session state
-if 'detector' not in st.session_state:
-    st.session_state.detector = RealtimeVoiceDetector()
-if 'robust_detector' not in st.session_state:
-    st.session_state.robust_detector = RobustVoiceDetector()
+def get_detectors():
+    """Per-session detector pair, created (and its modules imported) on first use."""
+    if 'detector' not in st.session_state:
+        from backend.realtime_detector import RealtimeVoiceDetector
+        st.session_state.detector = RealtimeVoiceDetector()
+    if 'robust_detector' not in st.session_state:
+        from backend.robust_detector import RobustVoiceDetector
+        st.session_state.robust_detector = RobustVoiceDetector()
+    return st.session_state.detector, st.session_state.robust_detector
+
+# Initialize session state
 if 'baseline_set' not in st.session_state:
     st.session_state.baseline_set = False
 
-# Sidebar for controls
-with st.sidebar:
+# Sidebar for controls. As a fragment, changing the strictness reruns only
+# this block; the value is read from session state when Analyze is clicked
+@st.fragment
+def sidebar_settings():
     st.header("Settings")
-    strictness = st.selectbox(
+    st.selectbox(
         "Matching Strictness", 
         ["strict", "normal", "relaxed", "very_relaxed"], 
         index=1,
+        key="strictness",
         help="Strict: High security, low tolerance. Very Relaxed: High tolerance for sickness/microphone differences"
     )
 
+with st.sidebar:
+    sidebar_settings()
+
 # Two-column layout
 col1, col2 = st.columns(2)
 
@@ -47,16 +91,17 @@ with col1:
     baseline_to_use = baseline_audio if baseline_audio else baseline_upload
     
     if baseline_to_use is not None:
-        st.audio(baseline_to_use)
+        st.audio(baseline_to_use.getvalue(), format="audio/wav")
         if st.button("Set as Signature"):
-            # Save Temp
-            with open("temp_baseline.wav", "wb") as f:
-                f.write(baseline_to_use.getbuffer())
-                
+            if not is_wav_upload(baseline_to_use):
+                st.error("Not a valid WAV file")
+                st.stop()
             with st.spinner("Extracting signature features..."):
-                success = st.session_state.detector.set_baseline("temp_baseline.wav")
-                if success:
-                    st.session_state.robust_detector.set_baseline(st.session_state.detector.baseline_features)
+                detector, robust_detector = get_detectors()
+                features = baseline_features(baseline_to_use)
+                if features:
+                    detector.baseline_features = features
+                    robust_detector.set_baseline(features)
                     st.session_state.baseline_set = True
                     st.success("✅ Signature successfully established!")
                 else:
@@ -72,66 +117,46 @@ with col2:
     test_to_use = test_audio if test_audio else test_upload
     
     if test_to_use is not None:
-        st.audio(test_to_use)
+        st.audio(test_to_use.getvalue(), format="audio/wav")
         
         if st.button("Analyze Audio"):
             if not st.session_state.baseline_set:
                 st.warning("⚠️ Please set a Signature Voice in Step 1 first!")
+            elif not is_wav_upload(test_to_use):
+                st.error("Not a valid WAV file")
             else:
                 with st.spinner("Analyzing..."):
-                    with open("temp_test.wav", "wb") as f:
-                        f.write(test_to_use.getbuffer())
-                        
                     # Load and analyze
-                    import soundfile as sf
-                    y, sr = sf.read("temp_test.wav")
-                    if len(y.shape) > 1:
-                        y = y.mean(axis=1) # Mono
-                        
-                    result = st.session_state.detector.analyze_chunk(y, sr)
+                    _, robust_detector = get_detectors()
+                    features = test_features(test_to_use)
                     
-                    if "error" in result:
-                        st.error(result["error"])
+                    if not features:
+                        st.error("Failed to extract features from test audio")
                     else:
-                        features = result["features"]
-                        robust_res = st.session_state.robust_detector.analyze(features, strictness=strictness)
+                        robust_res = robust_detector.analyze(features, strictness=st.session_state.strictness)
                         
                         st.divider()
                         
                         # --- Display Results ---
-                        
-                        # AI VS HUMAN Check
-                        if robust_res["is_ai_generated"]:
-                            st.error(f"🚨 **AI GENERATED VOICE DETECTED** (Phase Artifacts Too High)")
+                        # One status box and one table, rather than a widget per line
+                        ai_line = ("🚨 **AI GENERATED VOICE DETECTED** (Phase Artifacts Too High)"
+                                   if robust_res["is_ai_generated"] else "🗣️ **Voice Appears Human**")
+                        id_line = ("✅ **IDENTITY MATCH:** This matches the Signature Voice!"
+                                   if robust_res["is_match"] else "❌ **IDENTITY MISMATCH:** This is a different person!")
+                        status = f"{ai_line}  \n{id_line}"
+                        if robust_res["is_ai_generated"] or not robust_res["is_match"]:
+                            st.error(status)
                         else:
-                            st.success(f"🗣️ **Voice Appears Human**")
+                            st.success(status)
                         
-                        # Identity Matching Check
-                        if robust_res["is_match"]:
-                            st.success(f"✅ **IDENTITY MATCH:** This matches the Signature Voice!")
-                        else:
-                            st.warning(f"❌ **IDENTITY MISMATCH:** This is a different person!")
-                            
-                        # Metrics display
+                        # Metrics and detailed feature breakdown
                         st.markdown("### Analysis Metrics")
-                        m_col1, m_col2, m_col3 = st.columns(3)
-                        m_col1.metric("Confidence Score", f"{robust_res['confidence']:.1%}")
-                        m_col2.metric("Identity Deviation", f"{robust_res['deviation']:.1%}")
-                        m_col3.metric("Risk Level", robust_res['risk_level'])
-                        
-                        # Detailed Breakdown
-                        with st.expander("Detailed Feature Breakdown"):
-                            st.json({
-                                "Verdict": robust_res['verdict'],
-                                "MFCC Similarity (Identity)": f"{robust_res['mfcc_similarity']:.1%}",
-                                "Spectral Similarity (Tone)": f"{robust_res['spectral_similarity']:.1%}",
-                                "Phase Similarity (Authenticity)": f"{robust_res['phase_similarity']:.1%}"
-                            })
-
-# Cleanup
-if os.path.exists("temp_baseline.wav"):
-    try: os.remove("temp_baseline.wav")
-    except: pass
-if os.path.exists("temp_test.wav"):
-    try: os.remove("temp_test.wav")
-    except: pass
+                        st.dataframe([
+                            {"Metric": "Confidence Score", "Value": f"{robust_res['confidence']:.1%}"},
+                            {"Metric": "Identity Deviation", "Value": f"{robust_res['deviation']:.1%}"},
+                            {"Metric": "Risk Level", "Value": robust_res['risk_level']},
+                            {"Metric": "Verdict", "Value": robust_res['verdict']},
+                            {"Metric": "MFCC Similarity (Identity)", "Value": f"{robust_res['mfcc_similarity']:.1%}"},
+                            {"Metric": "Spectral Similarity (Tone)", "Value": f"{robust_res['spectral_similarity']:.1%}"},
+                            {"Metric": "Phase Similarity (Authenticity)", "Value": f"{robust_res['phase_similarity']:.1%}"},
+                        ], hide_index=True, width="stretch")
@@ -1,6 +1,8 @@
 import os
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
 
 # Configuration
@@ -8,6 +10,14 @@ API_URL = os.getenv("API_URL", "http://localhost:8000")
 
 st.set_page_config(page_title="Polyglot Ghost Voice Auth", layout="wide")
 
+
+@st.cache_resource
+def get_session():
+    """One pooled keep-alive session per server process, so uploads reuse the TLS connection to the API."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.5)))
+    return session
+
 st.title("The Polyglot Ghost Voice Authenticator")
 st.markdown("Authenticate whether the speaking voice matches the signature voice AND detect if it's an AI clone.")
 
@@ -29,7 +39,7 @@ with st.sidebar:
     
     if st.button("Reset Baseline"):
         try:
-            response = requests.post(f"{API_URL}/api/reset")
+            response = get_session().post(f"{API_URL}/api/reset")
             if response.status_code == 200:
                 st.session_state.baseline_set = False
                 st.success("Baseline reset successfully!")
@@ -59,7 +69,7 @@ with col1:
                     files = {"file": ("baseline.wav", baseline_to_use, "audio/wav")}
                     
                     # Send to API
-                    response = requests.post(f"{API_URL}/api/set-baseline", files=files)
+                    response = get_session().post(f"{API_URL}/api/set-baseline", files=files)
                     
                     if response.status_code == 200:
                         result = response.json()
@@ -94,7 +104,7 @@ with col2:
                         files = {"file": ("test.wav", test_to_use, "audio/wav")}
                         
                         # Send to API
-                        response = requests.post(
+                        response = get_session().post(
                             f"{API_URL}/api/analyze",
                             files=files,
                             params={"strictness": strictness}
@@ -1,6 +1,9 @@
 import os
+import hashlib
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
 
 # Configuration - Get from environment or Streamlit secrets
@@ -11,12 +14,42 @@ except:
 
 st.set_page_config(page_title="Polyglot Ghost Voice Auth", layout="wide")
 
+
+@st.cache_resource
+def get_session():
+    """One pooled keep-alive session per server process, so uploads reuse the TLS connection to the API."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.5)))
+    return session
+
+class APIError(Exception):
+    """Non-200 API reply. Raised rather than returned so st.cache_data never memoizes a failure."""
+
+# Analysis results persist on disk for a day, keyed on the baseline and test
+# audio digests plus strictness, so re-testing the same pair skips the API.
+# The leading underscore keeps the raw body out of Streamlit's cache hashing.
+# set-baseline is not cached: it changes server state, which a cold-started
+# backend has lost.
+@st.cache_data(persist="disk", ttl=24 * 60 * 60, max_entries=64, show_spinner=False)
+def cached_analyze(baseline_sha, test_sha, strictness, _body):
+    response = get_session().post(
+        f"{API_URL}/api/analyze",
+        data=_body,
+        headers={"Content-Type": "audio/wav"},
+        params={"strictness": strictness},
+        timeout=120
+    )
+    if response.status_code != 200:
+        raise APIError(response.json().get("detail", "Unknown error"))
+    return response.json()
+
 st.title("The Polyglot Ghost Voice Authenticator")
 st.markdown("Authenticate whether the speaking voice matches the signature voice AND detect if it's an AI clone.")
 
 # Initialize session state
 if 'baseline_set' not in st.session_state:
     st.session_state.baseline_set = False
+    st.session_state.baseline_sha = None
 
 # Sidebar for controls
 with st.sidebar:
@@ -33,9 +66,10 @@ with st.sidebar:
     
     if st.button("Reset Baseline"):
         try:
-            response = requests.post(f"{API_URL}/api/reset")
+            response = get_session().post(f"{API_URL}/api/reset")
             if response.status_code == 200:
                 st.session_state.baseline_set = False
+                st.session_state.baseline_sha = None
                 st.success("Baseline reset successfully!")
             else:
                 st.error("Failed to reset baseline")
@@ -59,15 +93,19 @@ with col1:
         if st.button("Set as Signature"):
             with st.spinner("Extracting signature features... (may take 60-90s on first request - backend is waking up)"):
                 try:
-                    # Prepare file for upload
-                    files = {"file": ("baseline.wav", baseline_to_use, "audio/wav")}
-                    
-                    # Send to API with longer timeout for cold starts
-                    response = requests.post(f"{API_URL}/api/set-baseline", files=files, timeout=180)
+                    # Send the wav as a raw body (no multipart framing), with a longer timeout for cold starts
+                    body = baseline_to_use.getvalue()
+                    response = get_session().post(
+                        f"{API_URL}/api/set-baseline",
+                        data=body,
+                        headers={"Content-Type": "audio/wav"},
+                        timeout=180
+                    )
                     
                     if response.status_code == 200:
                         result = response.json()
                         st.session_state.baseline_set = True
+                        st.session_state.baseline_sha = hashlib.sha256(body).hexdigest()
                         st.success("Signature successfully established!")
                     else:
                         error_detail = response.json().get("detail", "Unknown error")
@@ -100,52 +138,46 @@ with col2:
             else:
                 with st.spinner("Analyzing..."):
                     try:
-                        # Prepare file for upload
-                        files = {"file": ("test.wav", test_to_use, "audio/wav")}
-                        
-                        # Send to API
-                        response = requests.post(
-                            f"{API_URL}/api/analyze",
-                            files=files,
-                            params={"strictness": strictness},
-                            timeout=120
+                        # Send the wav as a raw body (no multipart framing); repeats hit the disk cache
+                        body = test_to_use.getvalue()
+                        result = cached_analyze(
+                            st.session_state.baseline_sha,
+                            hashlib.sha256(body).hexdigest(),
+                            strictness,
+                            body
                         )
                         
-                        if response.status_code == 200:
-                            result = response.json()
-                            
-                            st.divider()
-                            
-                            # Display Results
-                            if result["is_ai_generated"]:
-                                st.error("AI GENERATED VOICE DETECTED (Phase Artifacts Too High)")
-                            else:
-                                st.success("Voice Appears Human")
-                            
-                            if result["is_match"]:
-                                st.success("IDENTITY MATCH: This matches the Signature Voice!")
-                            else:
-                                st.warning("IDENTITY MISMATCH: This is a different person!")
-                            
-                            # Metrics display
-                            st.markdown("### Analysis Metrics")
-                            m_col1, m_col2, m_col3 = st.columns(3)
-                            m_col1.metric("Confidence Score", f"{result['confidence']:.1%}")
-                            m_col2.metric("Identity Deviation", f"{result['deviation']:.1%}")
-                            m_col3.metric("Risk Level", result['risk_level'])
-                            
-                            # Detailed Breakdown
-                            with st.expander("Detailed Feature Breakdown"):
-                                st.json({
-                                    "Verdict": result['verdict'],
-                                    "MFCC Similarity (Identity)": f"{result['mfcc_similarity']:.1%}",
-                                    "Spectral Similarity (Tone)": f"{result['spectral_similarity']:.1%}",
-                                    "Phase Similarity (Authenticity)": f"{result['phase_similarity']:.1%}"
-                                })
+                        st.divider()
+                        
+                        # Display Results
+                        if result["is_ai_generated"]:
+                            st.error("AI GENERATED VOICE DETECTED (Phase Artifacts Too High)")
+                        else:
+                            st.success("Voice Appears Human")
+                        
+                        if result["is_match"]:
+                            st.success("IDENTITY MATCH: This matches the Signature Voice!")
                         else:
-                            error_detail = response.json().get("detail", "Unknown error")
-                            st.error(f"Analysis failed: {error_detail}")
+                            st.warning("IDENTITY MISMATCH: This is a different person!")
+                        
+                        # Metrics display
+                        st.markdown("### Analysis Metrics")
+                        m_col1, m_col2, m_col3 = st.columns(3)
+                        m_col1.metric("Confidence Score", f"{result['confidence']:.1%}")
+                        m_col2.metric("Identity Deviation", f"{result['deviation']:.1%}")
+                        m_col3.metric("Risk Level", result['risk_level'])
+                        
+                        # Detailed Breakdown
+                        with st.expander("Detailed Feature Breakdown"):
+                            st.json({
+                                "Verdict": result['verdict'],
+                                "MFCC Similarity (Identity)": f"{result['mfcc_similarity']:.1%}",
+                                "Spectral Similarity (Tone)": f"{result['spectral_similarity']:.1%}",
+                                "Phase Similarity (Authenticity)": f"{result['phase_similarity']:.1%}"
+                            })
                     
+                    except APIError as e:
+                        st.error(f"Analysis failed: {e}")
                     except requests.Timeout:
                         st.warning("Request timed out. Please try again.")
                     except Exception as e:
@@ -1,15 +1,19 @@
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 API_URL = "http://localhost:8000"
 
+# Reuse one keep-alive connection for every call instead of reconnecting per request
+SESSION = requests.Session()
+
 print("=" * 80)
 print("TESTING BACKEND API")
 print("=" * 80)
 
 # Test 1: Health Check
 print("\n1. Health Check")
-r = requests.get(f"{API_URL}/health")
+r = SESSION.get(f"{API_URL}/health")
 print(f"   Status: {r.status_code}")
 print(f"   Response: {r.json()}")
 
@@ -17,62 +21,38 @@ print(f"   Response: {r.json()}")
 print("\n2. Set Baseline (clip_0.wav)")
 with open('dataset/real/clip_0.wav', 'rb') as f:
     files = {'file': f}
-    r = requests.post(f"{API_URL}/api/set-baseline", files=files)
+    r = SESSION.post(f"{API_URL}/api/set-baseline", files=files)
     print(f"   Status: {r.status_code}")
     print(f"   Response: {r.json()}")
 
-# Test 3: Analyze Same Voice
-print("\n3. Analyze Same Voice (clip_1.wav)")
-with open('dataset/real/clip_1.wav', 'rb') as f:
-    files = {'file': f}
-    r = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files)
-    result = r.json()
-    print(f"   Status: {r.status_code}")
-    print(f"   Is Match: {result['is_match']}")
-    print(f"   Is AI: {result['is_ai_generated']}")
-    print(f"   Verdict: {result['verdict']}")
-    print(f"   Confidence: {result['confidence']:.1%}")
-    print(f"   MFCC Similarity: {result['mfcc_similarity']:.1%}")
-
-# Test 4: Analyze Different Voice
-print("\n4. Analyze Different Voice (Furqanreal.wav)")
-with open('dataset/real/Furqanreal.wav', 'rb') as f:
-    files = {'file': f}
-    r = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files)
-    result = r.json()
-    print(f"   Status: {r.status_code}")
-    print(f"   Is Match: {result['is_match']}")
-    print(f"   Is AI: {result['is_ai_generated']}")
-    print(f"   Verdict: {result['verdict']}")
-    print(f"   Confidence: {result['confidence']:.1%}")
-    print(f"   MFCC Similarity: {result['mfcc_similarity']:.1%}")
+# Tests 3-6: the analyze calls only depend on the baseline, so they run
+# concurrently and are printed in order once each finishes
+def analyze(path):
+    with open(path, 'rb') as f:
+        files = {'file': f}
+        return SESSION.post(f"{API_URL}/api/analyze?strictness=normal", files=files)
 
-# Test 5: Analyze AI Voice
-print("\n5. Analyze AI Voice (Ali.wav)")
-with open('dataset/fake/Ali.wav', 'rb') as f:
-    files = {'file': f}
-    r = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files)
-    result = r.json()
-    print(f"   Status: {r.status_code}")
-    print(f"   Is Match: {result['is_match']}")
-    print(f"   Is AI: {result['is_ai_generated']}")
-    print(f"   Verdict: {result['verdict']}")
-    print(f"   Confidence: {result['confidence']:.1%}")
-    print(f"   MFCC Similarity: {result['mfcc_similarity']:.1%}")
-    print(f"   Phase Similarity: {result['phase_similarity']:.1%}")
+ANALYZE_TESTS = [
+    ("3. Analyze Same Voice (clip_1.wav)", 'dataset/real/clip_1.wav', False),
+    ("4. Analyze Different Voice (Furqanreal.wav)", 'dataset/real/Furqanreal.wav', False),
+    ("5. Analyze AI Voice (Ali.wav)", 'dataset/fake/Ali.wav', True),
+    ("6. Analyze ElevenLabs AI Clone (ai_clone_0.wav)", 'test_results/elevenlabs_test/ai_clone_0.wav', False),
+]
 
-# Test 6: Test with ElevenLabs AI Clone
-print("\n6. Analyze ElevenLabs AI Clone (ai_clone_0.wav)")
-with open('test_results/elevenlabs_test/ai_clone_0.wav', 'rb') as f:
-    files = {'file': f}
-    r = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files)
-    result = r.json()
-    print(f"   Status: {r.status_code}")
-    print(f"   Is Match: {result['is_match']}")
-    print(f"   Is AI: {result['is_ai_generated']}")
-    print(f"   Verdict: {result['verdict']}")
-    print(f"   Confidence: {result['confidence']:.1%}")
-    print(f"   MFCC Similarity: {result['mfcc_similarity']:.1%}")
+with ThreadPoolExecutor(max_workers=len(ANALYZE_TESTS)) as pool:
+    futures = [pool.submit(analyze, path) for _, path, _ in ANALYZE_TESTS]
+    for (title, _, show_phase), future in zip(ANALYZE_TESTS, futures):
+        r = future.result()
+        result = r.json()
+        print(f"\n{title}")
+        print(f"   Status: {r.status_code}")
+        print(f"   Is Match: {result['is_match']}")
+        print(f"   Is AI: {result['is_ai_generated']}")
+        print(f"   Verdict: {result['verdict']}")
+        print(f"   Confidence: {result['confidence']:.1%}")
+        print(f"   MFCC Similarity: {result['mfcc_similarity']:.1%}")
+        if show_phase:
+            print(f"   Phase Similarity: {result['phase_similarity']:.1%}")
 
 print("\n" + "=" * 80)
 print("API TESTING COMPLETE")
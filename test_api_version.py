@@ -2,13 +2,16 @@ import requests
 
 API_URL = "https://polyglot-ghost-api.onrender.com"
 
+# Reuse one keep-alive connection for every call instead of reconnecting per request
+SESSION = requests.Session()
+
 print("Testing API version...")
 print("=" * 60)
 
 # Test 1: Health check
 print("\n1. Health Check:")
 try:
-    r = requests.get(f"{API_URL}/health", timeout=10)
+    r = SESSION.get(f"{API_URL}/health", timeout=10)
     print(f"   Status: {r.status_code}")
     print(f"   Response: {r.json()}")
 except Exception as e:
@@ -17,7 +20,7 @@ except Exception as e:
 # Test 2: Root endpoint
 print("\n2. API Info:")
 try:
-    r = requests.get(f"{API_URL}/", timeout=10)
+    r = SESSION.get(f"{API_URL}/", timeout=10)
     print(f"   Status: {r.status_code}")
     print(f"   Response: {r.json()}")
 except Exception as e:
@@ -8,20 +8,22 @@ Calculates:
 """
 
 import sys
+import bisect
+import hashlib
 from pathlib import Path
-import librosa
 import numpy as np
 from elevenlabs.client import ElevenLabs
 from elevenlabs import VoiceSettings
 import os
 from dotenv import load_dotenv
 import json
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(str(Path(__file__).parent))
 
 from backend.realtime_detector import RealtimeVoiceDetector
 from backend.robust_detector import RobustVoiceDetector
+from backend.feature_extraction_fast import extract_features_batch
 
 load_dotenv()
 
@@ -51,10 +53,8 @@ def generate_ai_clone(text, output_path, voice_id="21m00Tcm4TlvDq8ikWAM"):
             )
         )
         
-        # Save audio
-        with open(output_path, 'wb') as f:
-            for chunk in audio:
-                f.write(chunk)
+        # Save audio: the SDK streams small frames, so join them and write once
+        Path(output_path).write_bytes(b"".join(audio))
         
         return True
     except Exception as e:
@@ -62,6 +62,15 @@ def generate_ai_clone(text, output_path, voice_id="21m00Tcm4TlvDq8ikWAM"):
         return False
 
 
+def json_default(obj):
+    """json.dump fallback for NumPy scalars and arrays coming out of the detectors."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def test_voice_authentication():
     """
     Test voice authentication system with ElevenLabs AI clones.
@@ -105,13 +114,40 @@ def test_voice_authentication():
         "Security and privacy are essential in modern authentication systems."
     ]
     
-    ai_clone_files = []
-    for i, text in enumerate(test_texts):
-        output_path = output_dir / f"ai_clone_{i}.wav"
-        if generate_ai_clone(text, str(output_path)):
-            ai_clone_files.append(str(output_path))
+    output_paths = [str(output_dir / f"ai_clone_{i}.wav") for i in range(len(test_texts))]
+    
+    # Clones are paid API calls: the manifest records which text each file was
+    # generated from, so unchanged clones are reused on later runs.
+    # Set ELEVENLABS_REGENERATE=1 to request them all again
+    manifest_path = output_dir / "clones_manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    text_hashes = [hashlib.sha256(text.encode()).hexdigest()[:12] for text in test_texts]
+    regenerate = os.getenv("ELEVENLABS_REGENERATE") == "1"
+    pending = [
+        i for i, (path, text_hash) in enumerate(zip(output_paths, text_hashes))
+        if regenerate or manifest.get(Path(path).name) != text_hash
+        or not Path(path).exists() or Path(path).stat().st_size == 0
+    ]
+    
+    # Each clone is a blocking HTTPS round trip, so request them all at once;
+    # map() keeps the results in text order
+    generated = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            generated = dict(zip(pending, pool.map(
+                generate_ai_clone, [test_texts[i] for i in pending], [output_paths[i] for i in pending]
+            )))
+    for i, ok in generated.items():
+        name = Path(output_paths[i]).name
+        if ok:
+            manifest[name] = text_hashes[i]
+        else:
+            manifest.pop(name, None)
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    
+    ai_clone_files = [path for i, path in enumerate(output_paths) if generated.get(i, i not in pending)]
     
-    print(f"\nGenerated {len(ai_clone_files)} AI clones")
+    print(f"\nGenerated {sum(generated.values())} AI clones, reused {len(output_paths) - len(pending)}")
     
     # Initialize detectors
     print("\n" + "=" * 80)
@@ -138,9 +174,26 @@ def test_voice_authentication():
         'false_negatives': [],  # Real voice incorrectly rejected
         'true_negatives': [],  # AI/Different speaker correctly rejected
         'false_positives': [],  # AI/Different speaker incorrectly accepted
-        'scores': []  # For EER calculation
+        # For EER calculation: one similarity score and label per tested file
+        'scores': [],
+        'labels': []  # 1 = genuine, 0 = impostor
     }
     
+    # Feature extraction for each test file is independent and CPU-bound, so
+    # fan it out across processes once; the steps below only score the results.
+    # Goes through the on-disk feature cache, so re-runs skip decode, resample
+    # and extraction for files that have not changed. extract_features applies
+    # the same mono + normalize_audio(3.5 s) step as the API's
+    # detector.analyze_chunk, so these are the features /api/analyze scores
+    # (pinned by tests/test_feature_extraction.py)
+    test_files = [f for f in test_real_files + different_speakers + ai_clone_files if Path(f).exists()]
+    test_features_by_file = dict(zip(test_files, extract_features_batch(test_files)))
+    # Score every extracted file against the baseline in one vectorized pass
+    scored_files = [f for f in test_files if test_features_by_file[f]]
+    robust_results_by_file = dict(zip(scored_files, robust_detector.analyze_batch(
+        [test_features_by_file[f] for f in scored_files]
+    )))
+    
     # Test 1: Real voice samples (same speaker) - Should ACCEPT
     print("\n" + "=" * 80)
     print("STEP 3: TESTING REAL VOICE SAMPLES (SAME SPEAKER)")
@@ -153,15 +206,11 @@ def test_voice_authentication():
         
         print(f"\n[{i}/{len(test_real_files)}] Testing: {Path(test_file).name}")
         
-        y, sr = librosa.load(test_file, sr=16000)
-        result = detector.analyze_chunk(y, sr)
-        
-        if 'features' not in result:
+        if not test_features_by_file[test_file]:
             print("  ERROR: No features extracted")
             continue
         
-        test_features = result['features']
-        robust_result = robust_detector.analyze(test_features)
+        robust_result = robust_results_by_file[test_file]
         
         is_match = robust_result['is_match']
         mfcc_similarity = robust_result['mfcc_similarity']
@@ -184,11 +233,8 @@ def test_voice_authentication():
             })
         
         # Store score for EER (positive class)
-        results['scores'].append({
-            'score': mfcc_similarity,
-            'label': 1,  # Genuine
-            'type': 'real_same_speaker'
-        })
+        results['scores'].append(mfcc_similarity)
+        results['labels'].append(1)  # Genuine
     
     # Test 2: Different speakers - Should REJECT
     print("\n" + "=" * 80)
@@ -199,15 +245,11 @@ def test_voice_authentication():
     for i, test_file in enumerate(different_speakers, 1):
         print(f"\n[{i}/{len(different_speakers)}] Testing: {Path(test_file).name}")
         
-        y, sr = librosa.load(test_file, sr=16000)
-        result = detector.analyze_chunk(y, sr)
-        
-        if 'features' not in result:
+        if not test_features_by_file[test_file]:
             print("  ERROR: No features extracted")
             continue
         
-        test_features = result['features']
-        robust_result = robust_detector.analyze(test_features)
+        robust_result = robust_results_by_file[test_file]
         
         is_match = robust_result['is_match']
         mfcc_similarity = robust_result['mfcc_similarity']
@@ -230,11 +272,8 @@ def test_voice_authentication():
             })
         
         # Store score for EER (negative class)
-        results['scores'].append({
-            'score': mfcc_similarity,
-            'label': 0,  # Impostor
-            'type': 'different_speaker'
-        })
+        results['scores'].append(mfcc_similarity)
+        results['labels'].append(0)  # Impostor
     
     # Test 3: AI clones - Should REJECT
     print("\n" + "=" * 80)
@@ -245,15 +284,11 @@ def test_voice_authentication():
     for i, test_file in enumerate(ai_clone_files, 1):
         print(f"\n[{i}/{len(ai_clone_files)}] Testing: {Path(test_file).name}")
         
-        y, sr = librosa.load(test_file, sr=16000)
-        result = detector.analyze_chunk(y, sr)
-        
-        if 'features' not in result:
+        if not test_features_by_file[test_file]:
             print("  ERROR: No features extracted")
             continue
         
-        test_features = result['features']
-        robust_result = robust_detector.analyze(test_features)
+        robust_result = robust_results_by_file[test_file]
         
         is_match = robust_result['is_match']
         is_deepfake = robust_result.get('is_deepfake', False)
@@ -282,11 +317,8 @@ def test_voice_authentication():
             })
         
         # Store score for EER (negative class)
-        results['scores'].append({
-            'score': mfcc_similarity,
-            'label': 0,  # Impostor
-            'type': 'ai_clone'
-        })
+        results['scores'].append(mfcc_similarity)
+        results['labels'].append(0)  # Impostor
     
     # Calculate metrics
     print("\n" + "=" * 80)
@@ -310,7 +342,9 @@ def test_voice_authentication():
     frr = fn / (fn + tp) if (fn + tp) > 0 else 0
     
     # Calculate EER
-    eer, eer_threshold = calculate_eer(results['scores'])
+    score_arr = np.asarray(results['scores'], dtype=np.float64)
+    label_arr = np.asarray(results['labels'], dtype=np.int8)
+    eer, eer_threshold = calculate_eer(score_arr, label_arr)
     
     print(f"\nConfusion Matrix:")
     print(f"  True Positives (TP):  {tp} - Real voice correctly accepted")
@@ -348,7 +382,7 @@ def test_voice_authentication():
         print(f"    Accepted: {ai_fp}/{ai_total} ({ai_fp/ai_total*100:.1f}%)")
     
     # Plot ROC curve
-    plot_roc_curve(results['scores'], output_dir)
+    plot_roc_curve(score_arr, label_arr, output_dir)
     
     # Save results
     results_file = output_dir / "test_results.json"
@@ -373,7 +407,7 @@ def test_voice_authentication():
                 'true_negatives': results['true_negatives'],
                 'false_positives': results['false_positives']
             }
-        }, f, indent=2)
+        }, f, indent=2, default=json_default)
     
     print(f"\nResults saved to: {results_file}")
     
@@ -399,68 +433,78 @@ def test_voice_authentication():
     return results
 
 
-def calculate_eer(scores):
-    """Calculate Equal Error Rate (EER) from scores."""
+def calculate_eer(scores, labels):
+    """Calculate Equal Error Rate (EER) from parallel score and label (1 = genuine) arrays."""
     # Separate genuine and impostor scores
-    genuine_scores = [s['score'] for s in scores if s['label'] == 1]
-    impostor_scores = [s['score'] for s in scores if s['label'] == 0]
+    genuine_scores = np.sort(scores[labels == 1])
+    impostor_scores = np.sort(scores[labels == 0])
     
-    if not genuine_scores or not impostor_scores:
+    if not len(genuine_scores) or not len(impostor_scores):
         return 0.0, 0.0
     
-    # Try different thresholds
-    all_scores = sorted(set(genuine_scores + impostor_scores))
-    
-    best_eer = 1.0
-    best_threshold = 0.0
+    # Every distinct score is a candidate threshold
+    thresholds = np.unique(np.concatenate([genuine_scores, impostor_scores]))
+    n_gen, n_imp = len(genuine_scores), len(impostor_scores)
     
-    for threshold in all_scores:
+    def rates(i):
         # FAR: Impostor accepted (score >= threshold)
-        fa = sum(1 for s in impostor_scores if s >= threshold)
-        far = fa / len(impostor_scores)
-        
+        far = (n_imp - np.searchsorted(impostor_scores, thresholds[i], side='left')) / n_imp
         # FRR: Genuine rejected (score < threshold)
-        fr = sum(1 for s in genuine_scores if s < threshold)
-        frr = fr / len(genuine_scores)
-        
-        # EER is where FAR = FRR
-        eer = abs(far - frr)
-        
-        if eer < best_eer:
-            best_eer = (far + frr) / 2
-            best_threshold = threshold
-    
-    return best_eer, best_threshold
+        frr = np.searchsorted(genuine_scores, thresholds[i], side='left') / n_gen
+        return far, frr
+    
+    def gap(i):
+        far, frr = rates(i)
+        return frr - far
+    
+    # FRR - FAR never decreases as the threshold rises, so the crossing (EER)
+    # is found by bisection: O(log N) threshold evaluations, each two binary searches
+    indices = range(len(thresholds))
+    k = bisect.bisect_left(indices, 0.0, key=gap)
+    candidates = [i for i in (k - 1, k) if 0 <= i < len(thresholds)]
+    best = min(candidates, key=lambda i: abs(gap(i)))
+    # Earliest threshold with the same gap, as a linear sweep would report
+    best = bisect.bisect_left(indices, gap(best), key=gap)
+    
+    far, frr = rates(best)
+    return float((far + frr) / 2), float(thresholds[best])
 
 
-def plot_roc_curve(scores, output_dir):
-    """Plot ROC curve and DET curve."""
-    genuine_scores = [s['score'] for s in scores if s['label'] == 1]
-    impostor_scores = [s['score'] for s in scores if s['label'] == 0]
+def plot_roc_curve(scores, labels, output_dir):
+    """
+    Save the FAR/FRR curves to curves.npz, and render the ROC and DET plots
+    to a PNG only when PLOT=1 (the figure dominates the script's teardown).
+    """
+    genuine_scores = np.sort(scores[labels == 1])
+    impostor_scores = np.sort(scores[labels == 0])
     
-    if not genuine_scores or not impostor_scores:
+    if not len(genuine_scores) or not len(impostor_scores):
         return
     
-    # Calculate FAR and FRR for different thresholds
+    # Calculate FAR and FRR for different thresholds (one binary search per threshold)
     thresholds = np.linspace(0, 1, 100)
-    far_list = []
-    frr_list = []
+    # FAR: Impostor accepted (score >= threshold)
+    far_list = 1 - np.searchsorted(impostor_scores, thresholds, side='left') / len(impostor_scores)
+    # FRR: Genuine rejected (score < threshold)
+    frr_list = np.searchsorted(genuine_scores, thresholds, side='left') / len(genuine_scores)
     
-    for threshold in thresholds:
-        fa = sum(1 for s in impostor_scores if s >= threshold)
-        far = fa / len(impostor_scores) if impostor_scores else 0
-        
-        fr = sum(1 for s in genuine_scores if s < threshold)
-        frr = fr / len(genuine_scores) if genuine_scores else 0
-        
-        far_list.append(far)
-        frr_list.append(frr)
+    np.savez_compressed(output_dir / 'curves.npz', far=far_list, frr=frr_list, thresholds=thresholds)
+    print(f"\nFAR/FRR curves saved to: {output_dir / 'curves.npz'}")
+    
+    if os.getenv("PLOT") != "1":
+        return
+    
+    # Imported here, with the save-only Agg backend, so runs that never reach
+    # the plot skip pyplot and GUI backend start-up
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
     
     # Plot
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
     
     # ROC Curve
-    ax1.plot(far_list, [1-f for f in frr_list], 'b-', linewidth=2)
+    ax1.plot(far_list, 1 - frr_list, 'b-', linewidth=2)
     ax1.plot([0, 1], [0, 1], 'r--', label='Random')
     ax1.set_xlabel('False Acceptance Rate (FAR)')
     ax1.set_ylabel('True Acceptance Rate (1 - FRR)')
@@ -478,13 +522,13 @@ def plot_roc_curve(scores, output_dir):
     ax2.legend()
     
     # Find EER point
-    eer_idx = np.argmin(np.abs(np.array(far_list) - np.array(frr_list)))
+    eer_idx = np.argmin(np.abs(far_list - frr_list))
     ax2.plot(far_list[eer_idx], frr_list[eer_idx], 'ro', markersize=10, label=f'EER: {far_list[eer_idx]:.2%}')
     ax2.legend()
     
     plt.tight_layout()
     plt.savefig(output_dir / 'roc_det_curves.png', dpi=300, bbox_inches='tight')
-    print(f"\nROC and DET curves saved to: {output_dir / 'roc_det_curves.png'}")
+    print(f"ROC and DET curves saved to: {output_dir / 'roc_det_curves.png'}")
     plt.close()
 
 
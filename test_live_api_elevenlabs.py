@@ -1,11 +1,23 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
 API_URL = "https://polyglot-ghost-api.onrender.com"
 
+# Reuse one keep-alive connection for every call instead of reconnecting per request;
+# failed connects to a cold-starting Render instance are retried with backoff
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=3, backoff_factor=0.5)))
+
+# Uploads go out as raw audio/wav bodies streamed from the open file, rather
+# than being read into memory and wrapped in multipart framing first
+WAV_HEADERS = {"Content-Type": "audio/wav"}
+
 print("=" * 80)
 print("TESTING LIVE API WITH ELEVENLABS AI VOICES")
 print("=" * 80)
@@ -15,9 +27,8 @@ print("\n1. Setting Baseline (Real Voice)")
 print("   File: dataset/real/clip_0.wav")
 
 with open('dataset/real/clip_0.wav', 'rb') as f:
-    files = {'file': f}
     try:
-        response = requests.post(f"{API_URL}/api/set-baseline", files=files, timeout=120)
+        response = SESSION.post(f"{API_URL}/api/set-baseline", data=f, headers=WAV_HEADERS, timeout=120)
         print(f"   Status: {response.status_code}")
         if response.status_code == 200:
             print(f"   ✅ {response.json()['message']}")
@@ -35,8 +46,7 @@ print("\n2. Testing Same Voice (Should ACCEPT)")
 print("   File: dataset/real/clip_1.wav")
 
 with open('dataset/real/clip_1.wav', 'rb') as f:
-    files = {'file': f}
-    response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
+    response = SESSION.post(f"{API_URL}/api/analyze?strictness=normal", data=f, headers=WAV_HEADERS, timeout=120)
     result = response.json()
     
     print(f"   Status: {response.status_code}")
@@ -55,8 +65,7 @@ print("\n3. Testing Different Voice (Should REJECT)")
 print("   File: dataset/real/Furqanreal.wav")
 
 with open('dataset/real/Furqanreal.wav', 'rb') as f:
-    files = {'file': f}
-    response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
+    response = SESSION.post(f"{API_URL}/api/analyze?strictness=normal", data=f, headers=WAV_HEADERS, timeout=120)
     result = response.json()
     
     print(f"   Status: {response.status_code}")
@@ -75,8 +84,7 @@ print("\n4. Testing AI Voice from Dataset (Should DETECT AI)")
 print("   File: dataset/fake/Ali.wav")
 
 with open('dataset/fake/Ali.wav', 'rb') as f:
-    files = {'file': f}
-    response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
+    response = SESSION.post(f"{API_URL}/api/analyze?strictness=normal", data=f, headers=WAV_HEADERS, timeout=120)
     result = response.json()
     
     print(f"   Status: {response.status_code}")
@@ -96,8 +104,7 @@ print("   File: test_results/elevenlabs_test/ai_clone_0.wav")
 
 if os.path.exists('test_results/elevenlabs_test/ai_clone_0.wav'):
     with open('test_results/elevenlabs_test/ai_clone_0.wav', 'rb') as f:
-        files = {'file': f}
-        response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
+        response = SESSION.post(f"{API_URL}/api/analyze?strictness=normal", data=f, headers=WAV_HEADERS, timeout=120)
         result = response.json()
         
         print(f"   Status: {response.status_code}")
@@ -120,25 +127,27 @@ else:
 # Test 6: Test Multiple ElevenLabs Clones
 print("\n6. Testing Multiple ElevenLabs AI Clones")
 
+def analyze_clone(clone_file):
+    with open(clone_file, 'rb') as f:
+        return SESSION.post(f"{API_URL}/api/analyze?strictness=normal", data=f, headers=WAV_HEADERS, timeout=120).json()
+
+clone_files = [(i, f'test_results/elevenlabs_test/ai_clone_{i}.wav') for i in range(5)]
+clone_files = [(i, path) for i, path in clone_files if os.path.exists(path)]
+
 ai_detected = 0
-total_clones = 0
-
-for i in range(5):
-    clone_file = f'test_results/elevenlabs_test/ai_clone_{i}.wav'
-    if os.path.exists(clone_file):
-        total_clones += 1
-        with open(clone_file, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{API_URL}/api/analyze?strictness=normal", files=files, timeout=120)
-            result = response.json()
-            
-            if result['is_ai_generated']:
-                ai_detected += 1
-                print(f"   Clone {i}: ✅ AI DETECTED - {result['verdict'][:50]}...")
-            elif not result['is_match']:
-                print(f"   Clone {i}: ⚠️ REJECTED (not flagged as AI)")
-            else:
-                print(f"   Clone {i}: ❌ ACCEPTED (should detect AI)")
+total_clones = len(clone_files)
+
+# The clones are independent and I/O-bound, so post them concurrently (one
+# worker per pooled connection) and report in clone order
+with ThreadPoolExecutor(max_workers=4) as pool:
+    for (i, _), result in zip(clone_files, pool.map(analyze_clone, [path for _, path in clone_files])):
+        if result['is_ai_generated']:
+            ai_detected += 1
+            print(f"   Clone {i}: ✅ AI DETECTED - {result['verdict'][:50]}...")
+        elif not result['is_match']:
+            print(f"   Clone {i}: ⚠️ REJECTED (not flagged as AI)")
+        else:
+            print(f"   Clone {i}: ❌ ACCEPTED (should detect AI)")
 
 if total_clones > 0:
     detection_rate = (ai_detected / total_clones) * 100
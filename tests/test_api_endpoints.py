@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT / "backend"))
+
+import api
+
+client = TestClient(api.app)
+
+
+def _upload(name):
+    return (ROOT / "dataset" / name).read_bytes()
+
+
+def test_batch_endpoint_matches_single_analyze():
+    r = client.post("/api/set-baseline", files={"file": ("clip_0.wav", _upload("real/clip_0.wav"))})
+    assert r.status_code == 200
+
+    names = ["real/clip_1.wav", "fake/Ali.wav"]
+    single = []
+    for name in names:
+        r = client.post("/api/analyze?strictness=normal", files={"file": (name, _upload(name))})
+        assert r.status_code == 200
+        single.append(r.json())
+
+    r = client.post(
+        "/api/analyze-batch?strictness=normal",
+        files=[("files", (name, _upload(name))) for name in names],
+    )
+    assert r.status_code == 200
+    batched = r.json()["results"]
+
+    assert batched == single
+
+
+def test_set_baseline_without_audio_is_a_client_error():
+    r = client.post("/api/set-baseline")
+    assert r.status_code == 400
+    assert r.json()["detail"].startswith("No audio provided")
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from backend import feature_extraction_fast
+from backend.feature_extraction_fast import extract_features
+from backend.realtime_detector import RealtimeVoiceDetector
+
+
+def _load(name):
+    return sf.read(ROOT / "dataset" / name, dtype="float32")
+
+
+def test_cached_features_match_fresh_extraction(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_extraction_fast, "FEATURE_CACHE_DIR", str(tmp_path))
+    path = str(ROOT / "dataset" / "real" / "clip_1.wav")
+
+    fresh = feature_extraction_fast.extract_features_cached(path)
+    cached = feature_extraction_fast.extract_features_cached(path)
+
+    assert list(tmp_path.iterdir())
+    assert fresh.keys() == cached.keys()
+    for key, value in fresh.items():
+        if isinstance(value, np.ndarray):
+            assert isinstance(cached[key], np.ndarray), key
+            np.testing.assert_array_equal(cached[key], value, err_msg=key)
+        else:
+            assert cached[key] == value, key
+
+
+def test_file_features_match_detector_chunk_features():
+    # Offline scripts score extract_features(path); the API scores analyze_chunk
+    for name in ["real/clip_1.wav", "fake/Ali.wav"]:
+        from_file = extract_features(str(ROOT / "dataset" / name))
+        from_chunk = RealtimeVoiceDetector.extract_chunk_features(*_load(name))
+
+        assert from_file.keys() == from_chunk.keys()
+        for key, value in from_chunk.items():
+            if isinstance(value, (np.ndarray, float)):
+                np.testing.assert_allclose(from_file[key], value, rtol=1e-6, atol=1e-9, err_msg=key)